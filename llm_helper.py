@@ -5,19 +5,545 @@ This module handles all interactions with the OpenAI API and provides
 text formatting utilities for processing AI responses.
 """
 
+import contextlib
+import functools
+import hashlib
+import html
+import io
+import json
 import os
+import random
 import re
-from typing import List, Tuple, Optional
-import openai
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Tuple, Optional
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import asyncio
+    import mmap
+    import openai
+    import pandas
+    import tiktoken
+
 
 # Environment & API Key
 ROOT = Path(__file__).parent
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai.api_key = OPENAI_API_KEY
 
 MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.1
+MAX_TOKENS = 4096
+
+# Context window sizes, used to size max_tokens and reject oversized prompts
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-3.5-turbo": 16_385,
+}
+DEFAULT_CONTEXT_TOKENS = 128_000
+MESSAGE_OVERHEAD_TOKENS = 4
+CONTEXT_SAFETY_TOKENS = 256
+MIN_COMPLETION_TOKENS = 256
+
+# Large pastes are sampled down to this size before being sent
+MAX_DATA_CHARS = 40_000
+SAMPLE_HEAD_ROWS = 50
+SAMPLE_MIDDLE_ROWS = 50
+SAMPLE_TAIL_ROWS = 50
+STATS_MAX_COLUMNS = 50
+CHARS_PER_TOKEN = 4
+ENCODING_NAME = "o200k_base"
+
+# Response cache settings
+CACHE_PATH = ROOT / ".llm_cache.sqlite3"
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_DISK_ENTRIES = 10_000
+CONTEXT_CHAIN_TURNS = 4
+HISTORY_TURNS = 10
+DATA_CONTEXT_CACHE_SIZE = 8
+
+# Concurrent request settings
+BATCH_CONCURRENCY = 10
+RETRY_ATTEMPTS = 5
+RETRY_MAX_WAIT = 30.0
+
+# Network timeout per API request, in seconds; the client's default is ten minutes
+API_TIMEOUT_SECONDS = 60.0
+
+# Filler words ignored when matching rephrased questions in the semantic cache
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "the", "this", "that", "these", "those", "it", "its",
+    "please", "can", "could", "would", "you", "me", "i", "my", "is", "are",
+    "to", "into", "as",
+})
+
+# The system prompt and data come first and stay byte-identical across
+# questions, so the provider's automatic prompt caching can reuse them.
+SYSTEM_PROMPT = (
+    "You are an expert data analyst assistant. The user has provided data "
+    "and wants you to analyze it. Always format your responses with "
+    "markdown for better readability. Use headers (###), bullet points (-), "
+    "and **bold** text appropriately, and provide a comprehensive analysis "
+    "that is easy to read and understand."
+)
+
+# Several queued questions are sent as one prompt and the reply split on these headings
+COMBINED_QUESTIONS_PROMPT = (
+    "Answer each of the following questions separately. Start each answer "
+    "with a line of the form \"### Answer N\", where N is the question's number."
+)
+_ANSWER_HEADING_RE = re.compile(r'^#{1,3}\s*\**Answer\s+(\d+)\**:?\**\s*$', re.MULTILINE | re.IGNORECASE)
+
+
+def fingerprint(text: str) -> str:
+    """
+    Compute a short, stable digest of a (possibly very large) text.
+    
+    Args:
+        text (str): The text to fingerprint.
+        
+    Returns:
+        str: A 32-character BLAKE2b hex digest of the text.
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_HEADER_RE = re.compile(r'^(#{1,3}) (.*?)$', re.MULTILINE)
+_CODE_FENCE_RE = re.compile(r'^```[^\n]*\n(.*?)^```[ \t]*$', re.MULTILINE | re.DOTALL)
+_CODE_BLOCK_TEMPLATE = (
+    '<pre style="margin: 8px 0; padding: 10px; background: #edf2f7; '
+    'font-family: Consolas, Monaco, monospace; font-size: 10pt;">{}</pre>'
+)
+# A run of bullet lines, or any other non-blank line; blank lines match neither
+_MARKDOWN_BLOCK_RE = re.compile(
+    r'(?P<items>(?:^[^\S\n]*- (?=.*\S).*(?:\n|\Z))+)|^(?P<line>(?=.*\S).*)$',
+    re.MULTILINE,
+)
+_BULLET_ITEM_RE = re.compile(r'^[^\S\n]*- (.*\S)', re.MULTILINE)
+_LIST_OPEN = '<ul style="margin: 8px 0; padding-left: 20px;">\n<li style="margin: 4px 0; line-height: 1.4;">'
+_LIST_ITEM_SEPARATOR = '</li>\n<li style="margin: 4px 0; line-height: 1.4;">'
+_LIST_CLOSE = '</li>\n</ul>'
+_PARAGRAPH_TEMPLATE = '<p style="margin: 8px 0; line-height: 1.5;">{}</p>'
+_HEADER_TEMPLATES = {
+    1: '<h1 style="color: #1a365d; margin: 20px 0 12px 0; font-size: 18pt; font-weight: bold;">{}</h1>',
+    2: '<h2 style="color: #1e4176; margin: 18px 0 10px 0; font-size: 16pt; font-weight: bold;">{}</h2>',
+    3: '<h3 style="color: #2c5aa0; margin: 16px 0 8px 0; font-size: 14pt; font-weight: bold;">{}</h3>',
+}
+
+# Fixed segments of the chat message bubbles, joined around the sender and message
+_USER_PRE = (
+    '<div style="margin: 16px 0; padding: 12px 16px; background: #e6fffa; '
+    'border-left: 4px solid #38b2ac; border-radius: 8px;">'
+    '<div style="font-weight: bold; color: #2c7a7b; margin-bottom: 6px;">👤 '
+)
+_USER_MID = ':</div><div style="color: #234e52; line-height: 1.5;">'
+_USER_POST = '</div></div>'
+_AI_PRE = (
+    '<div style="margin: 16px 0; padding: 16px; background: #f0f9ff; '
+    'border-left: 4px solid #3b82f6; border-radius: 8px;">'
+    '<div style="font-weight: bold; color: #1e40af; margin-bottom: 8px;">🤖 AI Assistant:</div>'
+    '<div style="color: #1e3a8a; line-height: 1.6;">'
+)
+_AI_POST = '</div></div>'
+
+
+def _replace_bold(match: "re.Match[str]") -> str:
+    """
+    Convert a **bold** span matched by _BOLD_RE.
+    
+    Args:
+        match (re.Match[str]): The match to convert.
+        
+    Returns:
+        str: The HTML replacement.
+    """
+    return '<b>' + match.group(1) + '</b>'
+
+
+def _replace_header(match: "re.Match[str]") -> str:
+    """
+    Convert a #/##/### header line matched by _HEADER_RE.
+    
+    Args:
+        match (re.Match[str]): The match to convert.
+        
+    Returns:
+        str: The HTML replacement.
+    """
+    return _HEADER_TEMPLATES[len(match.group(1))].format(match.group(2))
+
+
+def _render_markdown_block(match: "re.Match[str]") -> str:
+    """
+    Convert a bullet run or single line matched by _MARKDOWN_BLOCK_RE.
+    
+    Args:
+        match (re.Match[str]): The match to convert.
+        
+    Returns:
+        str: The HTML list or paragraph.
+    """
+    items = match.group('items')
+    if items is None:
+        return _PARAGRAPH_TEMPLATE.format(match.group('line'))
+    return _LIST_OPEN + _LIST_ITEM_SEPARATOR.join(_BULLET_ITEM_RE.findall(items)) + _LIST_CLOSE
+
+
+@functools.lru_cache(maxsize=None)
+def _get_openai() -> ModuleType:
+    """
+    Import and configure the OpenAI client on first use.
+    
+    The openai package takes several hundred milliseconds to import, so it
+    is loaded when the first request is made rather than at startup. The
+    client's own retries are turned off; _call_openai retries instead.
+    
+    Returns:
+        ModuleType: The configured openai module.
+    """
+    import openai
+    openai.api_key = OPENAI_API_KEY
+    openai.timeout = API_TIMEOUT_SECONDS
+    openai.max_retries = 0
+    return openai
+
+
+@functools.lru_cache(maxsize=None)
+def _transient_errors() -> Tuple[type, ...]:
+    """
+    Get the API errors that are worth retrying.
+    
+    Returns:
+        Tuple[type, ...]: The retryable exception types.
+    """
+    openai = _get_openai()
+    return (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding() -> Optional["tiktoken.Encoding"]:
+    """
+    Get the tokenizer used by the supported models.
+    
+    tiktoken is imported here so it is only loaded once tokens are counted.
+    
+    Returns:
+        Optional[tiktoken.Encoding]: The shared tokenizer instance, or None if
+            its data could not be loaded (it is downloaded on first use).
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        return None
+
+
+def truncate_data(data: str, max_chars: int = MAX_DATA_CHARS) -> str:
+    """
+    Shrink pasted data so the prompt stays bounded regardless of paste size.
+    
+    Tabular data keeps its header row plus the first, last and evenly spaced
+    middle rows, with a note giving the original row count. Anything still
+    too large (or not row-oriented) is cut to a token budget. The sampling is
+    deterministic so repeated questions produce identical prompts.
+    
+    Args:
+        data (str): The data to shrink.
+        max_chars (int): The size above which data is shrunk.
+        
+    Returns:
+        str: The data, or a sample of it no larger than about max_chars.
+    """
+    if len(data) <= max_chars:
+        return data
+    
+    rows = data.splitlines()
+    sample_size = SAMPLE_HEAD_ROWS + SAMPLE_MIDDLE_ROWS + SAMPLE_TAIL_ROWS
+    if len(rows) > sample_size + 1:
+        header, body = rows[0], rows[1:]
+        middle = body[SAMPLE_HEAD_ROWS:-SAMPLE_TAIL_ROWS]
+        step = len(middle) / SAMPLE_MIDDLE_ROWS
+        kept = (
+            body[:SAMPLE_HEAD_ROWS]
+            + [middle[int(i * step)] for i in range(SAMPLE_MIDDLE_ROWS)]
+            + body[-SAMPLE_TAIL_ROWS:]
+        )
+        data = "\n".join(
+            [f"[Note: showing {len(kept)} of {len(body)} rows]", header] + kept
+        )
+        if len(data) <= max_chars:
+            return data
+    
+    encoding = _get_encoding()
+    if encoding is None:
+        return f"[Note: data truncated to the first {max_chars} of {len(data)} characters]\n" + data[:max_chars]
+    
+    budget = max_chars // CHARS_PER_TOKEN
+    tokens = encoding.encode(data, disallowed_special=())
+    if len(tokens) <= budget:
+        return data
+    return (
+        f"[Note: data truncated to the first {budget} of {len(tokens)} tokens]\n"
+        + encoding.decode(tokens[:budget])
+    )
+
+
+def _read_table(data: str, sep: str, path: Optional[str] = None) -> "pandas.DataFrame":
+    """
+    Parse delimited text, or the file it came from, into a DataFrame.
+    
+    pyarrow's multithreaded CSV reader is used when it is installed, as it is
+    several times faster than pandas on large inputs; otherwise, or if it
+    rejects the data, pandas parses it. Both are imported on first use.
+    
+    Args:
+        data (str): The delimited text, with a header row.
+        sep (str): The field delimiter.
+        path (Optional[str]): A UTF-8 file to parse instead of data.
+        
+    Returns:
+        pandas.DataFrame: The parsed rows. Malformed rows are skipped.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pa = None
+    if pa is not None:
+        options = pacsv.ParseOptions(delimiter=sep, invalid_row_handler=lambda row: "skip")
+        source = path if path is not None else pa.BufferReader(data.encode("utf-8"))
+        try:
+            return pacsv.read_csv(source, parse_options=options).to_pandas()
+        except pa.ArrowInvalid:
+            pass
+    
+    import pandas as pd
+    if path is not None:
+        return pd.read_csv(
+            path, sep=sep, encoding="utf-8-sig", encoding_errors="replace",
+            on_bad_lines="skip", low_memory=False,
+        )
+    return pd.read_csv(io.StringIO(data), sep=sep, on_bad_lines="skip", low_memory=False)
+
+
+def summarize_data(data: str, path: Optional[str] = None) -> str:
+    """
+    Compute per-column statistics over every row of tabular data.
+    
+    When data is sampled the model only sees a few hundred rows, so these
+    statistics are sent along with the sample. pandas is imported on first use.
+    
+    Args:
+        data (str): CSV or TSV data with a header row.
+        path (Optional[str]): The file data was sampled from, if any; the
+            statistics then cover every row of the file.
+        
+    Returns:
+        str: A table of statistics for up to STATS_MAX_COLUMNS columns, or an
+            empty string if the data could not be parsed into several columns.
+    """
+    header = data.partition("\n")[0]
+    sep = "\t" if "\t" in header else ","
+    try:
+        frame = _read_table(data, sep, path)
+    except Exception:
+        return ""
+    if frame.empty or frame.shape[1] < 2:
+        return ""
+    
+    stats = frame.iloc[:, :STATS_MAX_COLUMNS].describe(include="all").T
+    return stats.to_string(na_rep="", float_format=lambda value: f"{value:.6g}")
+
+
+def sample_mapped_data(mapped: "mmap.mmap") -> str:
+    """
+    Sample rows from a memory-mapped data file without reading all of it.
+    
+    Like truncate_data, this keeps the header row plus the first, last and
+    evenly spaced middle rows, but the rows are located by byte offset so
+    only the sampled rows are read and decoded. Rows are split on newline
+    bytes, so the file must be UTF-8 (with or without a byte order mark).
+    
+    Args:
+        mapped (mmap.mmap): The mapped file contents (any bytes-like object
+            with find and rfind works).
+        
+    Returns:
+        str: The header row followed by the sampled rows.
+    """
+    size = len(mapped)
+    
+    def line_end(pos: int) -> int:
+        end = mapped.find(b"\n", pos)
+        return size if end < 0 else end + 1
+    
+    header_end = line_end(0)
+    head_end = header_end
+    for _ in range(SAMPLE_HEAD_ROWS):
+        head_end = line_end(head_end)
+    
+    tail_start = size - 1 if mapped[-1:] == b"\n" else size
+    for _ in range(SAMPLE_TAIL_ROWS):
+        tail_start = mapped.rfind(b"\n", 0, tail_start)
+        if tail_start < 0:
+            break
+    tail_start = max(tail_start + 1, head_end)
+    
+    middle: List[bytes] = []
+    step = (tail_start - head_end) / SAMPLE_MIDDLE_ROWS
+    last_start = -1
+    for i in range(SAMPLE_MIDDLE_ROWS):
+        start = line_end(head_end + int(i * step) - 1)
+        if start >= tail_start:
+            break
+        if start != last_start:
+            middle.append(mapped[start:line_end(start)])
+            last_start = start
+    
+    header = mapped[:header_end].decode("utf-8-sig", errors="replace").rstrip("\r\n")
+    body = b"".join([mapped[header_end:head_end], *middle, mapped[tail_start:]])
+    return "\n".join([header] + body.decode("utf-8", errors="replace").splitlines())
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Compute how long to wait before retrying a failed API call.
+    
+    Uses exponential backoff with full jitter so that concurrent clients
+    hitting a rate limit do not retry in lockstep.
+    
+    Args:
+        attempt (int): The zero-based number of the attempt that failed.
+        
+    Returns:
+        float: The delay in seconds.
+    """
+    return random.uniform(0, min(RETRY_MAX_WAIT, 2 ** attempt))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a text, estimating if the tokenizer is unavailable.
+    
+    Args:
+        text (str): The text to count.
+        
+    Returns:
+        int: The number of tokens.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass(slots=True)
+class DataContext:
+    """Everything derived from a pasted dataset that is reused across questions."""
+    
+    fingerprint: str
+    truncated: str
+    tokens: int
+
+
+def normalize_question(question: str) -> str:
+    """
+    Reduce a question to the words that determine its meaning, in order.
+    
+    Case, punctuation and filler words are dropped, but word order and
+    numbers are kept, so only trivial rephrasings normalize alike:
+    
+    >>> normalize_question("Convert to JSON") == normalize_question("convert this to json!")
+    True
+    >>> normalize_question("Convert the CSV to JSON") == normalize_question("Convert the JSON to CSV")
+    False
+    >>> normalize_question("Is revenue higher than cost") == normalize_question("Is cost higher than revenue")
+    False
+    >>> normalize_question("Show the max price per region") == normalize_question("Show the min price per region")
+    False
+    >>> normalize_question("Top 5 rows") == normalize_question("Top 10 rows")
+    False
+    
+    Args:
+        question (str): The question to normalize.
+        
+    Returns:
+        str: The remaining words separated by spaces, or an empty string if
+            none remain.
+    """
+    return " ".join(
+        word for word in _WORD_RE.findall(question.lower())
+        if word not in _STOPWORDS
+    )
+
+
+def context_chain(history: Optional[List[Tuple[str, str]]]) -> Tuple[str, ...]:
+    """
+    Identify the conversation turns leading up to a question.
+    
+    Args:
+        history (Optional[List[Tuple[str, str]]]): Prior (sender, message) turns.
+        
+    Returns:
+        Tuple[str, ...]: Fingerprints of the last CONTEXT_CHAIN_TURNS turns.
+    """
+    if not history:
+        return ()
+    return tuple(
+        fingerprint(f"{sender}\x1f{message}")
+        for sender, message in history[-CONTEXT_CHAIN_TURNS:]
+    )
+
+
+def combine_questions(questions: List[str]) -> str:
+    """
+    Build a single prompt asking several questions at once.
+    
+    Args:
+        questions (List[str]): The questions, in the order they were asked.
+        
+    Returns:
+        str: A prompt listing the numbered questions.
+    """
+    numbered = "\n".join(f"{index}) {question}" for index, question in enumerate(questions, 1))
+    return f"{COMBINED_QUESTIONS_PROMPT}\n\n{numbered}"
+
+
+def split_answers(response: str, count: int) -> Optional[List[str]]:
+    """
+    Split the reply to a combine_questions prompt into one answer per question.
+    
+    Args:
+        response (str): The LLM's reply.
+        count (int): The number of questions that were asked.
+        
+    Returns:
+        Optional[List[str]]: The answers in question order, or None if the reply
+            does not contain exactly one heading per question, in order.
+    """
+    headings = list(_ANSWER_HEADING_RE.finditer(response))
+    if [int(match.group(1)) for match in headings] != list(range(1, count + 1)):
+        return None
+    ends = [match.start() for match in headings[1:]] + [len(response)]
+    return [response[match.end():end].strip() for match, end in zip(headings, ends)]
+
+
+class SemanticCacheEntry(NamedTuple):
+    """A cached response along with what is needed to match it again."""
+    
+    model: str
+    data_fingerprint: str
+    context_chain: Tuple[str, ...]
+    normalized_question: str
+    response: str
 
 
 class LLMHelper:
@@ -36,6 +562,12 @@ class LLMHelper:
             model (str): The OpenAI model to use for API calls.
         """
         self.model = model
+        self.max_data_chars = MAX_DATA_CHARS
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._semantic_cache: List[SemanticCacheEntry] = []
+        self._data_contexts: "OrderedDict[Tuple[str, int, Optional[str]], DataContext]" = OrderedDict()
+        self._last_context: Optional[Tuple[str, int, Optional[str], DataContext]] = None
+        self._closed = threading.Event()
         self._setup_api()
     
     def _setup_api(self) -> None:
@@ -50,14 +582,15 @@ class LLMHelper:
                 "OPENAI_API_KEY environment variable is not set. "
                 "Please set it before using the application."
             )
-        openai.api_key = OPENAI_API_KEY
     
     def format_markdown_to_html(self, text: str) -> str:
         """
         Convert basic markdown formatting to HTML.
         
         This method converts markdown elements like headers, bold text,
-        and bullet points to properly formatted HTML for display in Qt widgets.
+        bullet points and fenced code blocks to properly formatted HTML for
+        display in Qt widgets. The text is HTML-escaped first, so tags in the
+        response are shown literally rather than interpreted by Qt.
         
         Args:
             text (str): The markdown text to convert.
@@ -65,67 +598,492 @@ class LLMHelper:
         Returns:
             str: The converted HTML text.
         """
-        # Replace **bold** with <b>
-        text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
+        text = html.escape(text, quote=False)
+        
+        if '```' not in text:
+            return self._format_markdown_text(text)
+        
+        # Render fenced code blocks verbatim; format the text between them
+        pieces = []
+        position = 0
+        for match in _CODE_FENCE_RE.finditer(text):
+            pieces.append(self._format_markdown_text(text[position:match.start()]))
+            pieces.append(_CODE_BLOCK_TEMPLATE.format(match.group(1).rstrip('\n')))
+            position = match.end()
+        pieces.append(self._format_markdown_text(text[position:]))
+        
+        return '\n'.join(piece for piece in pieces if piece)
+    
+    def _format_markdown_text(self, text: str) -> str:
+        """
+        Convert headers, bold text and bullet points in escaped text to HTML.
+        
+        Args:
+            text (str): The HTML-escaped markdown text to convert.
+            
+        Returns:
+            str: The converted HTML text.
+        """
+        # Replace **bold** and then #/##/### headers. Two passes with literal
+        # prefixes scan faster than a single alternation, which defeats the
+        # regex engine's prefix search.
+        text = _BOLD_RE.sub(_replace_bold, text)
+        text = _HEADER_RE.sub(_replace_header, text)
+        
+        # Wrap bullet runs in HTML lists and other lines in paragraphs
+        return '\n'.join(
+            _render_markdown_block(match) for match in _MARKDOWN_BLOCK_RE.finditer(text)
+        )
+    
+    def get_data_context(self, data: str, source: Optional[str] = None) -> DataContext:
+        """
+        Get the prepared form of a dataset, building it on first use.
+        
+        Follow-up questions about the same paste reuse the truncated data and
+        token count instead of recomputing them. When the caller passes the
+        same string object as last time even the fingerprint is skipped.
+        
+        Args:
+            data (str): The data to analyze.
+            source (Optional[str]): The file data was sampled from, as by
+                sample_mapped_data. The prompt then notes the sampling, and
+                column statistics are computed over the whole file.
+            
+        Returns:
+            DataContext: The prepared data.
+        """
+        last = self._last_context
+        if last is not None and last[0] is data and last[1:3] == (self.max_data_chars, source):
+            return last[3]
+        
+        key = (fingerprint(data), self.max_data_chars, source)
+        ctx = self._data_contexts.get(key)
+        if ctx is None:
+            truncated = truncate_data(data, self.max_data_chars)
+            if source is not None:
+                rows = data.count("\n")
+                size = os.path.getsize(source)
+                truncated = (
+                    f"[Note: showing {rows} rows sampled from a "
+                    f"{size / (1024 * 1024):.0f} MB file]\n{truncated}"
+                )
+            if source is not None or len(data) > self.max_data_chars:
+                stats = summarize_data(data, source)
+                if stats:
+                    truncated = f"{truncated}\n\n[Column statistics over all rows]\n{stats}"
+            ctx = DataContext(key[0], truncated, count_tokens(truncated))
+            self._data_contexts[key] = ctx
+            if len(self._data_contexts) > DATA_CONTEXT_CACHE_SIZE:
+                self._data_contexts.popitem(last=False)
+        else:
+            self._data_contexts.move_to_end(key)
+        self._last_context = (data, self.max_data_chars, source, ctx)
+        return ctx
+    
+    def _cache_key(
+        self, ctx: DataContext, question: str, turns: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Build the exact-match cache key for a request.
+        
+        The data is reduced to its fingerprint so that large pasted tables
+        do not bloat the key.
+        
+        Args:
+            ctx (DataContext): The prepared data to analyze.
+            question (str): The question to ask about the data.
+            turns (Optional[List[Dict[str, str]]]): The prior conversation
+                messages sent with the question.
+            
+        Returns:
+            str: The cache key for the request.
+        """
+        parts = (
+            self.model, SYSTEM_PROMPT, ctx.fingerprint, question,
+            str(TEMPERATURE), str(MAX_TOKENS), str(self.max_data_chars),
+            json.dumps(turns or []),
+        )
+        return fingerprint("\x1f".join(parts))
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, first in memory and then on disk.
+        
+        Disk entries older than CACHE_TTL_SECONDS are treated as misses.
+        
+        Args:
+            key (str): The cache key.
+            
+        Returns:
+            Optional[str]: The cached response, or None on a cache miss.
+        """
+        if key in self._response_cache:
+            self._response_cache.move_to_end(key)
+            return self._response_cache[key]
+        
+        try:
+            with contextlib.closing(self._open_disk_cache()) as db:
+                row = db.execute(
+                    "SELECT response FROM responses WHERE key = ? AND stored_at >= ?",
+                    (key, time.time() - CACHE_TTL_SECONDS),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+    
+    def _cache_put(self, key: str, response: str) -> None:
+        """
+        Store a response in the in-memory and on-disk caches.
+        
+        When the disk cache grows past CACHE_MAX_DISK_ENTRIES, expired entries
+        and then the oldest ones are evicted.
+        
+        Args:
+            key (str): The cache key.
+            response (str): The response to store.
+        """
+        self._remember(key, response)
+        now = time.time()
+        try:
+            with contextlib.closing(self._open_disk_cache()) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, stored_at, response) VALUES (?, ?, ?)",
+                    (key, now, response),
+                )
+                (count,) = db.execute("SELECT COUNT(*) FROM responses").fetchone()
+                if count > CACHE_MAX_DISK_ENTRIES:
+                    self._prune_disk_cache(db, now)
+        except sqlite3.Error:
+            pass
+    
+    @staticmethod
+    def _open_disk_cache() -> sqlite3.Connection:
+        """
+        Open the on-disk response cache, creating its tables on first use.
         
-        # Replace ### headers with styled headers
-        text = re.sub(
-            r'^### (.*?)$',
-            r'<h3 style="color: #2c5aa0; margin: 16px 0 8px 0; font-size: 14pt; font-weight: bold;">\1</h3>',
-            text,
-            flags=re.MULTILINE
+        SQLite reuses the pages of deleted rows, so pruning keeps the file
+        itself bounded, not just the number of entries. The same file records
+        Batch API jobs that have not finished yet.
+        
+        Returns:
+            sqlite3.Connection: A new connection; the caller closes it.
+        """
+        db = sqlite3.connect(CACHE_PATH, timeout=5.0)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, response TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS batches "
+            "(batch_id TEXT PRIMARY KEY, submitted_at REAL NOT NULL, questions TEXT NOT NULL)"
         )
+        return db
+    
+    @staticmethod
+    def _prune_disk_cache(db: sqlite3.Connection, now: float) -> None:
+        """
+        Evict expired entries, then the oldest, until the disk cache is under its limit.
         
-        # Replace ## headers
-        text = re.sub(
-            r'^## (.*?)$',
-            r'<h2 style="color: #1e4176; margin: 18px 0 10px 0; font-size: 16pt; font-weight: bold;">\1</h2>',
-            text,
-            flags=re.MULTILINE
+        Args:
+            db (sqlite3.Connection): The open disk cache.
+            now (float): The current time.
+        """
+        db.execute("DELETE FROM responses WHERE stored_at < ?", (now - CACHE_TTL_SECONDS,))
+        
+        # Keep headroom so pruning does not run again on the next write
+        db.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (CACHE_MAX_DISK_ENTRIES * 9 // 10,),
         )
+    
+    def _remember(self, key: str, response: str) -> None:
+        """
+        Insert a response into the in-memory LRU cache.
+        
+        Args:
+            key (str): The cache key.
+            response (str): The response to store.
+        """
+        self._response_cache[key] = response
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+    
+    def _semantic_lookup(
+        self, data_fingerprint: str, chain: Tuple[str, ...], normalized: str
+    ) -> Optional[str]:
+        """
+        Find a cached response to a rephrasing of a question about the same data.
+        
+        Follow-up questions ("change the color to red") look alike across
+        conversations, so an entry is only eligible when it was asked in the
+        same context: either both questions opened a conversation, or their
+        chains of preceding turns overlap.
+        
+        Args:
+            data_fingerprint (str): Fingerprint of the data being analyzed.
+            chain (Tuple[str, ...]): Context chain of the current question.
+            normalized (str): The question, as returned by normalize_question.
+            
+        Returns:
+            Optional[str]: The most recent response to a question that
+                normalizes the same way, otherwise None.
+        """
+        if not normalized:
+            return None
+        for entry in reversed(self._semantic_cache):
+            if (entry.model != self.model or entry.data_fingerprint != data_fingerprint
+                    or entry.normalized_question != normalized):
+                continue
+            if chain or entry.context_chain:
+                if set(chain).isdisjoint(entry.context_chain):
+                    continue
+            return entry.response
+        return None
+    
+    def _semantic_store(
+        self, data_fingerprint: str, chain: Tuple[str, ...],
+        normalized: str, response: str
+    ) -> None:
+        """
+        Add a response to the semantic cache, evicting the oldest entry when full.
         
-        # Replace # headers
-        text = re.sub(
-            r'^# (.*?)$',
-            r'<h1 style="color: #1a365d; margin: 20px 0 12px 0; font-size: 18pt; font-weight: bold;">\1</h1>',
-            text,
-            flags=re.MULTILINE
+        Args:
+            data_fingerprint (str): Fingerprint of the data being analyzed.
+            chain (Tuple[str, ...]): Context chain of the question.
+            normalized (str): The question, as returned by normalize_question.
+            response (str): The response to store.
+        """
+        if not normalized:
+            return
+        self._semantic_cache.append(
+            SemanticCacheEntry(self.model, data_fingerprint, chain, normalized, response)
         )
+        if len(self._semantic_cache) > CACHE_MAX_ENTRIES:
+            del self._semantic_cache[0]
+    
+    def _lookup_answer(
+        self, ctx: DataContext, question: str,
+        history: Optional[List[Tuple[str, str]]], turns: List[Dict[str, str]]
+    ) -> Tuple[str, Tuple[str, ...], str, Optional[str]]:
+        """
+        Look up a question in the response cache, then the semantic cache.
         
-        # Replace bullet points with proper HTML lists
-        lines = text.split('\n')
-        formatted_lines = []
-        in_list = False
-        
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('- '):
-                if not in_list:
-                    formatted_lines.append('<ul style="margin: 8px 0; padding-left: 20px;">')
-                    in_list = True
-                formatted_lines.append(f'<li style="margin: 4px 0; line-height: 1.4;">{stripped[2:]}</li>')
-            else:
-                if in_list:
-                    formatted_lines.append('</ul>')
-                    in_list = False
-                if stripped:
-                    formatted_lines.append(f'<p style="margin: 8px 0; line-height: 1.5;">{line}</p>')
+        Args:
+            ctx (DataContext): The prepared data.
+            question (str): The question to ask about the data.
+            history (Optional[List[Tuple[str, str]]]): The turns preceding the question.
+            turns (List[Dict[str, str]]): The history messages sent with the question.
+            
+        Returns:
+            Tuple[str, Tuple[str, ...], str, Optional[str]]: The cache key,
+                context chain and normalized question to store the answer
+                under with _store_answer, and the cached answer or None.
+        """
+        key = self._cache_key(ctx, question, turns)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return key, (), "", cached
         
-        if in_list:
-            formatted_lines.append('</ul>')
+        chain = context_chain(history)
+        # Combined prompts share boilerplate, so only exact repeats are reused
+        if question.startswith(COMBINED_QUESTIONS_PROMPT):
+            normalized = ""
+        else:
+            normalized = normalize_question(question)
+        similar = self._semantic_lookup(ctx.fingerprint, chain, normalized)
+        if similar is not None:
+            self._remember(key, similar)
+        return key, chain, normalized, similar
+    
+    def _store_answer(
+        self, ctx: DataContext, key: str, chain: Tuple[str, ...],
+        normalized: str, answer: str
+    ) -> None:
+        """
+        Store a fresh answer in the response and semantic caches.
+        
+        Args:
+            ctx (DataContext): The prepared data.
+            key (str): The cache key from _lookup_answer.
+            chain (Tuple[str, ...]): The context chain from _lookup_answer.
+            normalized (str): The normalized question from _lookup_answer.
+            answer (str): The answer to store.
+        """
+        self._cache_put(key, answer)
+        self._semantic_store(ctx.fingerprint, chain, normalized, answer)
+    
+    @staticmethod
+    def _history_messages(history: Optional[List[Tuple[str, str]]]) -> List[Dict[str, str]]:
+        """
+        Convert the most recent chat turns into API messages.
+        
+        Args:
+            history (Optional[List[Tuple[str, str]]]): Prior (sender, message) turns.
             
-        return '\n'.join(formatted_lines)
+        Returns:
+            List[Dict[str, str]]: The last HISTORY_TURNS turns as user and
+                assistant messages.
+        """
+        if not history:
+            return []
+        return [
+            {"role": "user" if sender == "You" else "assistant", "content": message}
+            for sender, message in history[-HISTORY_TURNS:]
+        ]
     
-    def ask_llm(self, data: str, question: str) -> str:
+    def _build_messages(
+        self, ctx: DataContext, question: str, turns: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages sent to the API for a question about data.
+        
+        The system prompt and data form a byte-identical prefix across
+        questions, so the provider's prompt cache keeps hitting; the
+        conversation so far and the new question follow it.
+        
+        Args:
+            ctx (DataContext): The prepared data to analyze.
+            question (str): The question to ask about the data.
+            turns (Optional[List[Dict[str, str]]]): Prior conversation messages.
+            
+        Returns:
+            List[Dict[str, str]]: The messages for the chat completion request.
+        """
+        return [
+            {"role": "system", "content": f"{SYSTEM_PROMPT}\n\nData:\n{ctx.truncated}"},
+            *(turns or []),
+            {"role": "user", "content": question}
+        ]
+    
+    def _completion_tokens(
+        self, ctx: DataContext, question: str, turns: Optional[List[Dict[str, str]]] = None
+    ) -> int:
+        """
+        Work out how many tokens the response may use, counting the prompt locally.
+        
+        Prompts that would not fit in the model's context window are rejected
+        here, before a request is sent.
+        
+        Args:
+            ctx (DataContext): The prepared data to analyze.
+            question (str): The question to ask about the data.
+            turns (Optional[List[Dict[str, str]]]): Prior conversation messages.
+            
+        Returns:
+            int: The max_tokens value for the request, at most MAX_TOKENS.
+            
+        Raises:
+            ValueError: If the prompt leaves too little room for a response.
+        """
+        context_tokens = MODEL_CONTEXT_TOKENS.get(self.model, DEFAULT_CONTEXT_TOKENS)
+        turns = turns or []
+        prompt_tokens = (
+            ctx.tokens
+            + count_tokens(SYSTEM_PROMPT)
+            + sum(count_tokens(turn["content"]) for turn in turns)
+            + count_tokens(question)
+            + (len(turns) + 2) * MESSAGE_OVERHEAD_TOKENS
+        )
+        available = context_tokens - prompt_tokens - CONTEXT_SAFETY_TOKENS
+        if available < MIN_COMPLETION_TOKENS:
+            raise ValueError(
+                f"The prompt is about {prompt_tokens:,} tokens, which does not fit in the "
+                f"{context_tokens:,}-token context window of {self.model}. "
+                "Lower the data size limit or clear the chat and try again."
+            )
+        return min(MAX_TOKENS, available)
+    
+    def _call_openai(
+        self, messages: List[Dict[str, str]], max_tokens: int, stream: bool = False
+    ) -> Any:
+        """
+        Create a chat completion, retrying transient failures.
+        
+        Rate-limit, connection and server errors are retried up to
+        RETRY_ATTEMPTS times with jittered exponential backoff; other errors
+        are raised immediately. For streamed requests only opening the
+        stream is retried, so no partial response is ever repeated. Waits
+        between attempts end early, with the last error, once close is called.
+        
+        Args:
+            messages (List[Dict[str, str]]): The messages to send.
+            max_tokens (int): The maximum number of tokens to generate.
+            stream (bool): Whether to stream the response.
+            
+        Returns:
+            Any: The completion, or a stream of completion chunks.
+        """
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return _get_openai().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    max_tokens=max_tokens,
+                    stream=stream,
+                )
+            except _transient_errors():
+                if attempt == RETRY_ATTEMPTS - 1 or self._closed.wait(retry_delay(attempt)):
+                    raise
+    
+    async def _call_openai_async(
+        self, client: "openai.AsyncOpenAI", messages: List[Dict[str, str]], max_tokens: int
+    ) -> Any:
+        """
+        Create a chat completion on an async client, retrying as _call_openai does.
+        
+        Args:
+            client (openai.AsyncOpenAI): The async client to use.
+            messages (List[Dict[str, str]]): The messages to send.
+            max_tokens (int): The maximum number of tokens to generate.
+            
+        Returns:
+            Any: The completion.
+        """
+        import asyncio
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=TEMPERATURE,
+                    max_tokens=max_tokens,
+                )
+            except _transient_errors():
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                # Waited on a pool thread so close() cuts the backoff short
+                if await asyncio.to_thread(self._closed.wait, retry_delay(attempt)):
+                    raise
+    
+    def ask_llm(
+        self,
+        data: str,
+        question: str,
+        history: Optional[List[Tuple[str, str]]] = None,
+        source: Optional[str] = None,
+    ) -> str:
         """
         Send a question about data to the LLM and get a response.
         
-        This method creates a prompt combining the provided data and question,
-        sends it to the OpenAI API, and returns the formatted response.
+        This is the blocking counterpart of stream_llm; it waits for the
+        whole response before returning it.
         
         Args:
             data (str): The data to analyze.
             question (str): The question to ask about the data.
+            history (Optional[List[Tuple[str, str]]]): The (sender, message) turns
+                preceding the question. The most recent are sent with it, and
+                they are used to validate semantic cache hits.
+            source (Optional[str]): The file data was sampled from, if any
+                (see get_data_context).
             
         Returns:
             str: The LLM's response to the question.
@@ -133,37 +1091,320 @@ class LLMHelper:
         Raises:
             Exception: If there's an error communicating with the OpenAI API.
         """
-        prompt = (
-            "You are an expert data analyst assistant. The user has provided data below "
-            "and wants you to analyze it. Please provide clear, well-formatted responses using "
-            "markdown formatting (headers with ###, bullet points with -, **bold** text) "
-            "to make your analysis easy to read and understand.\n\n"
-            f"Data:\n{data}\n\nQuestion: {question}\n\n"
-            "Please provide a comprehensive analysis with proper formatting."
-        )
-
-        messages = [
-            {
-                "role": "system", 
-                "content": (
-                    "You are a helpful data analyst. Always format your responses with "
-                    "markdown for better readability. Use headers (###), bullet points (-), "
-                    "and **bold** text appropriately."
-                )
-            },
-            {"role": "user", "content": prompt}
-        ]
+        return "".join(self.stream_llm(data, question, history, source)).strip()
+    
+    def stream_llm(
+        self,
+        data: str,
+        question: str,
+        history: Optional[List[Tuple[str, str]]] = None,
+        source: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Send a question about data to the LLM and stream back the response.
         
+        This method creates a prompt combining the provided data, recent
+        conversation and question, sends it to the OpenAI API, and yields the response text as it is
+        generated. Identical requests are answered from the response cache, and
+        questions differing only in case, punctuation or filler words from the
+        semantic cache; a cached response is yielded as a single chunk.
+        
+        Args:
+            data (str): The data to analyze.
+            question (str): The question to ask about the data.
+            history (Optional[List[Tuple[str, str]]]): The (sender, message) turns
+                preceding the question. The most recent are sent with it, and
+                they are used to validate semantic cache hits.
+            source (Optional[str]): The file data was sampled from, if any
+                (see get_data_context).
+            
+        Yields:
+            str: Successive fragments of the LLM's response.
+            
+        Raises:
+            ValueError: If the prompt does not fit in the model's context window.
+            Exception: If there's an error communicating with the OpenAI API.
+        """
+        ctx = self.get_data_context(data, source)
+        turns = self._history_messages(history)
+        key, chain, normalized, cached = self._lookup_answer(ctx, question, history, turns)
+        if cached is not None:
+            yield cached
+            return
+        
+        max_tokens = self._completion_tokens(ctx, question, turns)
+        parts: List[str] = []
         try:
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.1,
-                max_tokens=3000,
+            response = self._call_openai(
+                self._build_messages(ctx, question, turns), max_tokens, stream=True
             )
-            return response.choices[0].message.content.strip()
+            try:
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            finally:
+                # Also runs when the caller stops reading early, releasing the connection
+                response.close()
+        except Exception as e:
+            raise Exception(f"Error communicating with OpenAI API: {str(e)}")
+        
+        self._store_answer(ctx, key, chain, normalized, "".join(parts).strip())
+    
+    async def ask_llm_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        history: Optional[List[Tuple[str, str]]] = None,
+        source: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Ask several independent questions concurrently.
+        
+        Each question is prepared, cached and retried as in stream_llm, but
+        at most BATCH_CONCURRENCY requests are in flight at once.
+        
+        Args:
+            pairs (List[Tuple[str, str]]): (data, question) pairs to ask.
+            history (Optional[List[Tuple[str, str]]]): The (sender, message) turns
+                preceding the questions. The most recent are sent with each
+                question, and they are used to validate semantic cache hits.
+            source (Optional[str]): The file the data was sampled from, if any
+                (see get_data_context).
+            
+        Returns:
+            List[str]: The responses, in the same order as the pairs.
+            
+        Raises:
+            Exception: If any request fails after all retries.
+        """
+        import asyncio
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        async with _get_openai().AsyncOpenAI(
+            api_key=OPENAI_API_KEY, timeout=API_TIMEOUT_SECONDS, max_retries=0
+        ) as client:
+            return await asyncio.gather(*(
+                self._ask_one(client, semaphore, data, question, history, source)
+                for data, question in pairs
+            ))
+    
+    def run_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        history: Optional[List[Tuple[str, str]]] = None,
+        source: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Blocking wrapper around ask_llm_batch for use from a worker thread.
+        
+        Args:
+            pairs (List[Tuple[str, str]]): (data, question) pairs to ask.
+            history (Optional[List[Tuple[str, str]]]): The (sender, message) turns
+                preceding the questions. The most recent are sent with each
+                question, and they are used to validate semantic cache hits.
+            source (Optional[str]): The file the data was sampled from, if any
+                (see get_data_context).
+            
+        Returns:
+            List[str]: The responses, in the same order as the pairs.
+        """
+        import asyncio
+        return asyncio.run(self.ask_llm_batch(pairs, history, source))
+    
+    def submit_batch(self, jobs: List[Tuple[str, str]], source: Optional[str] = None) -> str:
+        """
+        Submit questions through the OpenAI Batch API.
+        
+        Batch requests cost about half as much as interactive ones in
+        exchange for a turnaround of up to 24 hours. Results are collected
+        with poll_batch. The batch is recorded on disk until poll_batch
+        sees it finish, so it can be resumed with pending_batches after a
+        restart.
+        
+        Args:
+            jobs (List[Tuple[str, str]]): (data, question) pairs to ask.
+            source (Optional[str]): The file the data was sampled from, if any
+                (see get_data_context).
+            
+        Returns:
+            str: The ID of the created batch.
+            
+        Raises:
+            Exception: If there's an error communicating with the OpenAI API.
+        """
+        lines = []
+        for index, (data, question) in enumerate(jobs):
+            ctx = self.get_data_context(data, source)
+            lines.append(json.dumps({
+                "custom_id": f"job-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": self._build_messages(ctx, question),
+                    "temperature": TEMPERATURE,
+                    "max_tokens": self._completion_tokens(ctx, question),
+                },
+            }))
+        
+        openai = _get_openai()
+        try:
+            batch_file = openai.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = openai.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except Exception as e:
+            raise Exception(f"Error communicating with OpenAI API: {str(e)}")
+        
+        try:
+            with contextlib.closing(self._open_disk_cache()) as db, db:
+                db.execute(
+                    "INSERT OR REPLACE INTO batches (batch_id, submitted_at, questions) "
+                    "VALUES (?, ?, ?)",
+                    (batch.id, time.time(), json.dumps([question for _, question in jobs])),
+                )
+        except sqlite3.Error:
+            pass
+        return batch.id
+    
+    def pending_batches(self) -> Dict[str, List[str]]:
+        """
+        Get the batches submitted with submit_batch that have not finished.
+        
+        Returns:
+            Dict[str, List[str]]: Batch ID to the questions it asks, oldest
+                batch first. Empty if the disk cache cannot be read.
+        """
+        try:
+            with contextlib.closing(self._open_disk_cache()) as db:
+                rows = db.execute(
+                    "SELECT batch_id, questions FROM batches ORDER BY submitted_at"
+                ).fetchall()
+        except sqlite3.Error:
+            return {}
+        return {batch_id: json.loads(questions) for batch_id, questions in rows}
+    
+    def poll_batch(self, batch_id: str) -> Tuple[str, Optional[List[str]]]:
+        """
+        Check on a batch submitted with submit_batch.
+        
+        Failed jobs are reported in the batch's error file rather than its
+        output file; when every job fails there is no output file at all.
+        Once the batch has finished it is no longer listed by pending_batches.
+        
+        Args:
+            batch_id (str): The ID of the batch.
+            
+        Returns:
+            Tuple[str, Optional[List[str]]]: The batch status and, once the
+                batch has completed, the responses in job order. Jobs that
+                failed have an error message in place of a response.
+            
+        Raises:
+            Exception: If there's an error communicating with the OpenAI API.
+        """
+        openai = _get_openai()
+        try:
+            batch = openai.batches.retrieve(batch_id)
+            if batch.status in ("failed", "expired", "cancelled"):
+                self._forget_batch(batch_id)
+            if batch.status != "completed":
+                return batch.status, None
+            outputs = [
+                openai.files.content(file_id).text
+                for file_id in (batch.output_file_id, batch.error_file_id) if file_id
+            ]
         except Exception as e:
             raise Exception(f"Error communicating with OpenAI API: {str(e)}")
+        
+        results: Dict[int, str] = {}
+        for line in "\n".join(outputs).splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            index = int(record["custom_id"].rsplit("-", 1)[1])
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                results[index] = response["body"]["choices"][0]["message"]["content"].strip()
+            else:
+                error = record.get("error") or (response.get("body") or {}).get("error") or {}
+                results[index] = f"Batch job failed: {error.get('message', 'unknown error')}"
+        
+        self._forget_batch(batch_id)
+        total = batch.request_counts.total if batch.request_counts else len(results)
+        return batch.status, [
+            results.get(index, "Batch job failed: no response") for index in range(total)
+        ]
+    
+    def _forget_batch(self, batch_id: str) -> None:
+        """
+        Remove a finished batch from the on-disk record of pending batches.
+        
+        Args:
+            batch_id (str): The ID of the batch.
+        """
+        try:
+            with contextlib.closing(self._open_disk_cache()) as db, db:
+                db.execute("DELETE FROM batches WHERE batch_id = ?", (batch_id,))
+        except sqlite3.Error:
+            pass
+    
+    async def _ask_one(
+        self, client: "openai.AsyncOpenAI", semaphore: "asyncio.Semaphore",
+        data: str, question: str,
+        history: Optional[List[Tuple[str, str]]], source: Optional[str]
+    ) -> str:
+        """
+        Ask a single question of a concurrent batch.
+        
+        Args:
+            client (openai.AsyncOpenAI): The async client shared by the batch.
+            semaphore (asyncio.Semaphore): Limits the number of requests in flight.
+            data (str): The data to analyze.
+            question (str): The question to ask about the data.
+            history (Optional[List[Tuple[str, str]]]): The turns preceding the question.
+            source (Optional[str]): The file the data was sampled from, if any.
+            
+        Returns:
+            str: The LLM's response to the question.
+            
+        Raises:
+            Exception: If the request fails after all retries.
+        """
+        ctx = self.get_data_context(data, source)
+        turns = self._history_messages(history)
+        key, chain, normalized, cached = self._lookup_answer(ctx, question, history, turns)
+        if cached is not None:
+            return cached
+        
+        max_tokens = self._completion_tokens(ctx, question, turns)
+        async with semaphore:
+            try:
+                response = await self._call_openai_async(
+                    client, self._build_messages(ctx, question, turns), max_tokens
+                )
+            except Exception as e:
+                raise Exception(f"Error communicating with OpenAI API: {str(e)}")
+        
+        answer = response.choices[0].message.content.strip()
+        self._store_answer(ctx, key, chain, normalized, answer)
+        return answer
+    
+    def close(self) -> None:
+        """
+        Give up on retries in progress so background requests end promptly.
+        
+        Requests already waiting on the network still run until they finish
+        or reach API_TIMEOUT_SECONDS.
+        """
+        self._closed.set()
     
     def format_chat_message(self, sender: str, message: str, is_user: bool = False) -> str:
         """
@@ -178,21 +1419,10 @@ class LLMHelper:
             str: The formatted HTML message.
         """
         if is_user:
-            return f"""
-            <div style="margin: 16px 0; padding: 12px 16px; background: #e6fffa; border-left: 4px solid #38b2ac; border-radius: 8px;">
-                <div style="font-weight: bold; color: #2c7a7b; margin-bottom: 6px;">👤 {sender}:</div>
-                <div style="color: #234e52; line-height: 1.5;">{message}</div>
-            </div>
-            """
-        else:
-            # Format AI response with markdown conversion
-            formatted_msg = self.format_markdown_to_html(message)
-            return f"""
-            <div style="margin: 16px 0; padding: 16px; background: #f0f9ff; border-left: 4px solid #3b82f6; border-radius: 8px;">
-                <div style="font-weight: bold; color: #1e40af; margin-bottom: 8px;">🤖 AI Assistant:</div>
-                <div style="color: #1e3a8a; line-height: 1.6;">{formatted_msg}</div>
-            </div>
-            """
+            message = html.escape(message).replace('\n', '<br>')
+            return ''.join((_USER_PRE, html.escape(sender), _USER_MID, message, _USER_POST))
+        # Format AI response with markdown conversion
+        return ''.join((_AI_PRE, self.format_markdown_to_html(message), _AI_POST))
     
     def build_chat_history_html(self, chat_history: List[Tuple[str, str]]) -> str:
         """
@@ -204,18 +1434,19 @@ class LLMHelper:
         Returns:
             str: The complete formatted HTML for all chat messages.
         """
-        formatted_html = ""
-        for sender, message in chat_history:
-            is_user = sender == "You"
-            formatted_html += self.format_chat_message(sender, message, is_user)
-        
-        return formatted_html
+        return "".join(
+            self.format_chat_message(sender, message, sender == "You")
+            for sender, message in chat_history
+        )
     
     @staticmethod
     def validate_api_key() -> bool:
         """
         Validate that the OpenAI API key is available.
         
+        The key is read once, when this module is imported, as it is for
+        the requests themselves.
+        
         Returns:
             bool: True if API key is available, False otherwise.
         """
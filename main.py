@@ -5,27 +5,319 @@ This module contains the main UI components and application logic,
 providing a PyQt6-based interface for data analysis using AI.
 """
 
+import codecs
+import contextlib
+import functools
+import io
+import mmap
 import os
 import sys
-from typing import List, Tuple, Optional
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Set, Tuple, Optional
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPlainTextEdit,
-    QPushButton, QFileDialog, QLineEdit, QFrame, QSplitter, QTextEdit
+    QPushButton, QFileDialog, QLineEdit, QFrame, QSplitter, QTextEdit, QCheckBox,
+    QSpinBox, QMessageBox, QProgressBar
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QColor, QFont, QTextBlockFormat, QTextCharFormat, QTextCursor
 
 # Import local modules
 from styles import (
-    get_main_stylesheet, get_header_frame_style, get_splitter_style,
-    get_container_style, get_data_edit_style, get_primary_button_style,
-    get_danger_button_style, get_chat_area_style, get_chat_input_style,
-    get_send_button_style, get_status_container_style, get_welcome_message,
-    STYLE_CONFIG
+    MAIN_STYLESHEET, HEADER_FRAME_STYLE, SPLITTER_STYLE,
+    CONTAINER_STYLE, DATA_EDIT_STYLE, PRIMARY_BUTTON_STYLE,
+    DANGER_BUTTON_STYLE, CHAT_AREA_STYLE, CHAT_INPUT_STYLE,
+    SEND_BUTTON_STYLE, STATUS_CONTAINER_STYLE, WELCOME_MESSAGE,
+    SPIN_BOX_STYLE, BUSY_BAR_STYLE, TITLE_LABEL_STYLE, SUBTITLE_LABEL_STYLE,
+    SECTION_HEADER_STYLE, INSTRUCTION_LABEL_STYLE, MUTED_LABEL_STYLE,
+    STATUS_LABEL_STYLE, FONTS
 )
-from llm_helper import LLMHelper
+from llm_helper import (
+    LLMHelper, MAX_DATA_CHARS, combine_questions, sample_mapped_data, split_answers
+)
+
+
+# How often pending Batch API jobs are checked, in milliseconds
+BATCH_POLL_INTERVAL_MS = 60_000
+
+# File loading settings
+FILE_CHUNK_SIZE = 1024 * 1024
+FILE_CHUNKS_IN_FLIGHT = 4
+LARGE_FILE_BYTES = 50 * 1024 * 1024
+SAMPLE_LOAD_ROWS = 10_000
+
+# Status messages set within this many milliseconds are shown as one repaint
+STATUS_FLUSH_MS = 33
+
+# Oldest chat blocks are evicted past this size; the full history is kept in chat_history
+CHAT_MAX_BLOCKS = 2000
+
+# Longest the window waits for background work when closing, in milliseconds.
+# A request still blocked on the network after that keeps the process alive
+# until it ends, at most the helper's API_TIMEOUT_SECONDS.
+CLOSE_WAIT_MS = 2000
+
+
+@functools.lru_cache(maxsize=None)
+def _fonts() -> Dict[str, QFont]:
+    """
+    Get the shared fonts, keyed by role.
+    
+    QFont needs a running QApplication, so the fonts are built on first use
+    rather than at import time, and then reused by every widget.
+    
+    Returns:
+        Dict[str, QFont]: The fonts for each text role.
+    """
+    return {
+        "title": QFont("Segoe UI", FONTS.title, QFont.Weight.Bold),
+        "subtitle": QFont("Segoe UI", FONTS.subtitle, QFont.Weight.Normal),
+        "header": QFont("Segoe UI", FONTS.header, QFont.Weight.Bold),
+        "normal": QFont("Segoe UI", FONTS.normal),
+        "small": QFont("Segoe UI", FONTS.small),
+        "label": QFont("Segoe UI", FONTS.small, QFont.Weight.Medium),
+        "code": QFont("JetBrains Mono, Consolas, Monaco", FONTS.code),
+    }
+
+
+def _file_encoding(head: bytes) -> str:
+    """
+    Pick the codec for a data file from its leading bytes.
+    
+    Args:
+        head (bytes): At least the first four bytes of the file.
+        
+    Returns:
+        str: "utf-16" or "utf-8-sig" if the file starts with that byte order
+        mark, otherwise "utf-8".
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    return "utf-8"
+
+
+class LLMStreamWorker(QObject):
+    """
+    Worker that streams an LLM response on a background thread.
+    
+    The worker runs on the global thread pool; response fragments and the
+    final result are delivered back to the UI thread through Qt signals.
+    """
+    
+    chunkReceived = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    
+    def __init__(
+        self, llm_helper: LLMHelper, data: str, question: str,
+        history: List[Tuple[str, str]], source: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the worker.
+        
+        Args:
+            llm_helper (LLMHelper): The helper used to query the LLM.
+            data (str): The data to analyze.
+            question (str): The question to ask about the data.
+            history (List[Tuple[str, str]]): The chat turns preceding the question.
+            source (Optional[str]): The file data was sampled from, if any.
+        """
+        super().__init__()
+        self.llm_helper = llm_helper
+        self.data = data
+        self.question = question
+        self.history = history
+        self.source = source
+        self._cancelled = False
+    
+    @pyqtSlot()
+    def run(self) -> None:
+        """
+        Stream the response, emitting each fragment as it arrives.
+        
+        A cancelled worker closes the stream and emits nothing more, since
+        the window it reports to may already be gone.
+        """
+        parts: List[str] = []
+        try:
+            with contextlib.closing(
+                self.llm_helper.stream_llm(self.data, self.question, self.history, self.source)
+            ) as stream:
+                for chunk in stream:
+                    if self._cancelled:
+                        return
+                    parts.append(chunk)
+                    self.chunkReceived.emit(chunk)
+        except Exception as ex:
+            if not self._cancelled:
+                self.failed.emit(str(ex))
+            return
+        if not self._cancelled:
+            self.finished.emit("".join(parts))
+    
+    def cancel(self) -> None:
+        """
+        Stop streaming after the next fragment.
+        """
+        self._cancelled = True
+
+
+class TaskWorker(QObject):
+    """
+    Worker that runs a single blocking call on a background thread.
+    """
+    
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, task: Callable[[], Any]) -> None:
+        """
+        Initialize the worker.
+        
+        Args:
+            task (Callable[[], Any]): The call to run.
+        """
+        super().__init__()
+        self.task = task
+        self._cancelled = False
+    
+    @pyqtSlot()
+    def run(self) -> None:
+        """
+        Run the task and emit its result, unless it was cancelled meanwhile.
+        """
+        try:
+            result = self.task()
+        except Exception as ex:
+            if not self._cancelled:
+                self.failed.emit(str(ex))
+            return
+        if not self._cancelled:
+            self.finished.emit(result)
+    
+    def cancel(self) -> None:
+        """
+        Discard the result; the blocking call itself cannot be interrupted.
+        """
+        self._cancelled = True
+
+
+class FileLoadWorker(QObject):
+    """
+    Worker that reads and decodes a data file on a background thread.
+    
+    The file is memory-mapped and decoded in FILE_CHUNK_SIZE slices. At most
+    FILE_CHUNKS_IN_FLIGHT decoded chunks wait for the UI at once, so a slow
+    editor does not make the whole file pile up in the event queue.
+    """
+    
+    chunkReady = pyqtSignal(str)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+    # Emitted last, even when cancelled, so the worker can be deleted
+    stopped = pyqtSignal()
+    
+    def __init__(self, file_path: str) -> None:
+        """
+        Initialize the worker.
+        
+        Args:
+            file_path (str): The path of the file to load.
+        """
+        super().__init__()
+        self.file_path = file_path
+        self._cancelled = False
+        self._slots = threading.Semaphore(FILE_CHUNKS_IN_FLIGHT)
+    
+    @pyqtSlot()
+    def run(self) -> None:
+        """
+        Decode the file, emitting each chunk of text as it is ready.
+        
+        The encoding is taken from a byte order mark if present and
+        otherwise assumed to be UTF-8, with undecodable bytes replaced.
+        """
+        try:
+            with open(self.file_path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size:
+                    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        self._decode(mapped)
+        except Exception as ex:
+            if not self._cancelled:
+                self.failed.emit(str(ex))
+        else:
+            if not self._cancelled:
+                self.finished.emit()
+        finally:
+            self.stopped.emit()
+    
+    def _decode(self, mapped: mmap.mmap) -> None:
+        """
+        Decode a mapped file slice by slice.
+        
+        Args:
+            mapped (mmap.mmap): The mapped file contents.
+        """
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(_file_encoding(mapped[:4]))(errors="replace"),
+            translate=True,
+        )
+        
+        size = len(mapped)
+        for start in range(0, size, FILE_CHUNK_SIZE):
+            end = min(start + FILE_CHUNK_SIZE, size)
+            text = decoder.decode(mapped[start:end], final=end == size)
+            if not text:
+                continue
+            while not self._slots.acquire(timeout=0.1):
+                if self._cancelled:
+                    return
+            if self._cancelled:
+                return
+            self.chunkReady.emit(text)
+    
+    def chunk_consumed(self) -> None:
+        """
+        Let the worker decode another chunk once the UI has appended one.
+        """
+        self._slots.release()
+    
+    def cancel(self) -> None:
+        """
+        Stop loading before the next chunk.
+        """
+        self._cancelled = True
+
+
+class WorkerRunnable(QRunnable):
+    """
+    Runnable that executes a worker's run slot on a thread pool thread.
+    
+    The worker stays owned by the UI thread, so its signals are queued back
+    to the UI thread's slots.
+    """
+    
+    def __init__(self, worker: QObject) -> None:
+        """
+        Initialize the runnable.
+        
+        Args:
+            worker (QObject): A worker with a run slot.
+        """
+        super().__init__()
+        self.worker = worker
+    
+    def run(self) -> None:
+        """
+        Run the worker.
+        """
+        self.worker.run()
 
 
 class DataChatBotDemo(QWidget):
@@ -39,12 +331,72 @@ class DataChatBotDemo(QWidget):
     def __init__(self) -> None:
         """Initialize the DataChatBotDemo widget."""
         super().__init__()
-        self.data_text: str = ""
+        self._data_cache: Optional[str] = None
+        self._data_mmap: Optional[mmap.mmap] = None
+        # The file behind _data_mmap; column statistics are read from it
+        self._data_path: Optional[str] = None
         self.chat_history: List[Tuple[str, str]] = []
+        # Indices of chat_history entries that are not sent to the AI as context
+        self._notices: Set[int] = set()
         self.llm_helper: LLMHelper = LLMHelper()
+        self._llm_worker: Optional[QObject] = None
+        self._stream_start: Optional[QTextCursor] = None
+        self._rendered_count: int = 0
+        self._chat_dirty: bool = False
+        self._stream_tokens: int = 0
+        self._stream_began_at: float = 0.0
+        self._pending: Deque[str] = deque()
+        self._in_flight: int = 0
+        self._batch_question: str = ""
+        self._pending_batches: Dict[str, str] = {}
         
+        self._create_message_formats()
         self._setup_window()
         self._build_ui()
+        
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setInterval(BATCH_POLL_INTERVAL_MS)
+        self._batch_timer.timeout.connect(self._poll_batches)
+        
+        # Bursts of status messages collapse into one label update
+        self._status_queue: Deque[str] = deque(maxlen=4)
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(STATUS_FLUSH_MS)
+        self._status_timer.timeout.connect(self._flush_status)
+        
+        # Batches submitted before the last restart are polled again
+        for batch_id, questions in self.llm_helper.pending_batches().items():
+            self._pending_batches[batch_id] = "; ".join(questions)
+        if self._pending_batches:
+            self._batch_timer.start()
+            self._set_status(f"📦 {len(self._pending_batches)} batch job(s) pending")
+        
+        # Files are decoded on a background thread and appended chunk by chunk
+        self._load_worker: Optional[FileLoadWorker] = None
+        self._load_filename: str = ""
+    
+    def _create_message_formats(self) -> None:
+        """
+        Create the text formats used to append user messages as plain text.
+        
+        User messages need no markup, so they are inserted with these formats
+        instead of going through the HTML parser.
+        """
+        self._user_sender_block = QTextBlockFormat()
+        self._user_sender_block.setBackground(QColor("#e6fffa"))
+        self._user_sender_block.setTopMargin(16)
+        self._user_sender_block.setLeftMargin(16)
+        self._user_body_block = QTextBlockFormat()
+        self._user_body_block.setBackground(QColor("#e6fffa"))
+        self._user_body_block.setLeftMargin(16)
+        self._user_body_block.setBottomMargin(16)
+        
+        self._user_sender_format = QTextCharFormat()
+        self._user_sender_format.setFontWeight(QFont.Weight.Bold)
+        self._user_sender_format.setForeground(QColor("#2c7a7b"))
+        self._user_body_format = QTextCharFormat()
+        self._user_body_format.setForeground(QColor("#234e52"))
     
     def _setup_window(self) -> None:
         """
@@ -54,7 +406,7 @@ class DataChatBotDemo(QWidget):
         """
         self.setWindowTitle("AI-Powered Data Chatbot - Demo by Bobby Azad")
         self.setMinimumSize(1200, 700)
-        self.setStyleSheet(get_main_stylesheet())
+        self.setStyleSheet(MAIN_STYLESHEET)
     
     def _build_ui(self) -> None:
         """
@@ -87,18 +439,18 @@ class DataChatBotDemo(QWidget):
             QFrame: The configured header frame widget.
         """
         header_frame = QFrame()
-        header_frame.setStyleSheet(get_header_frame_style())
+        header_frame.setStyleSheet(HEADER_FRAME_STYLE)
         header_layout = QVBoxLayout(header_frame)
         header_layout.setContentsMargins(20, 16, 20, 16)
         
         title_label = QLabel("🤖 AI-Powered Data Chatbot")
-        title_label.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["title"], QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #1a365d; margin: 0; background: transparent;")
+        title_label.setFont(_fonts()["title"])
+        title_label.setStyleSheet(TITLE_LABEL_STYLE)
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         subtitle = QLabel("Analyze your data with natural language • Demo by Bobby Azad")
-        subtitle.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["subtitle"], QFont.Weight.Normal))
-        subtitle.setStyleSheet("color: #2c5282; margin: 4px 0 0 0; background: transparent;")
+        subtitle.setFont(_fonts()["subtitle"])
+        subtitle.setStyleSheet(SUBTITLE_LABEL_STYLE)
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         header_layout.addWidget(title_label)
@@ -116,7 +468,7 @@ class DataChatBotDemo(QWidget):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         splitter.setChildrenCollapsible(False)
         splitter.setHandleWidth(6)
-        splitter.setStyleSheet(get_splitter_style())
+        splitter.setStyleSheet(SPLITTER_STYLE)
         
         # Left Panel: Data Input
         data_container = self._create_data_input_panel()
@@ -139,35 +491,40 @@ class DataChatBotDemo(QWidget):
             QWidget: The configured data input panel widget.
         """
         data_container = QWidget()
-        data_container.setStyleSheet(get_container_style())
+        data_container.setStyleSheet(CONTAINER_STYLE)
         data_layout = QVBoxLayout(data_container)
         data_layout.setContentsMargins(24, 20, 24, 20)
         data_layout.setSpacing(12)
 
         # Header
         data_header = QLabel("📊 Data Input")
-        data_header.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["header"], QFont.Weight.Bold))
-        data_header.setStyleSheet("color: #2d3748; margin-bottom: 8px;")
+        data_header.setFont(_fonts()["header"])
+        data_header.setStyleSheet(SECTION_HEADER_STYLE)
         data_layout.addWidget(data_header)
 
         # Instruction
         data_instruction = QLabel("Paste your CSV, TSV, or tabular data below:")
-        data_instruction.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["normal"]))
-        data_instruction.setStyleSheet("color: #4a5568; margin-bottom: 4px;")
+        data_instruction.setFont(_fonts()["normal"])
+        data_instruction.setStyleSheet(INSTRUCTION_LABEL_STYLE)
         data_layout.addWidget(data_instruction)
 
         # Data input text area
         self.data_edit = QPlainTextEdit()
         self.data_edit.setPlaceholderText("Paste your data here or use the buttons below to load from clipboard/file...")
-        self.data_edit.setFont(QFont("JetBrains Mono, Consolas, Monaco", STYLE_CONFIG["font_sizes"]["code"]))
+        self.data_edit.setFont(_fonts()["code"])
         self.data_edit.setMinimumHeight(280)
-        self.data_edit.setStyleSheet(get_data_edit_style())
+        self.data_edit.setStyleSheet(DATA_EDIT_STYLE)
+        self.data_edit.textChanged.connect(self._invalidate_data_cache)
         data_layout.addWidget(self.data_edit, 1)
 
         # Button container
         btn_container = self._create_data_buttons()
         data_layout.addWidget(btn_container)
         
+        # Prompt size limit
+        limit_container = self._create_data_limit_row()
+        data_layout.addWidget(limit_container)
+        
         return data_container
     
     def _create_data_buttons(self) -> QWidget:
@@ -186,20 +543,20 @@ class DataChatBotDemo(QWidget):
         # Paste button
         paste_btn = QPushButton("📋 Paste from Clipboard")
         paste_btn.setMinimumHeight(40)
-        paste_btn.setStyleSheet(get_primary_button_style())
+        paste_btn.setStyleSheet(PRIMARY_BUTTON_STYLE)
         paste_btn.clicked.connect(self._paste_clipboard)
         
         # Load file button
         load_btn = QPushButton("📁 Load File")
         load_btn.setMinimumHeight(40)
-        load_btn.setStyleSheet(get_primary_button_style())
+        load_btn.setStyleSheet(PRIMARY_BUTTON_STYLE)
         load_btn.clicked.connect(self._load_file)
         
         # Clear button
         clear_btn = QPushButton("🗑️ Clear")
         clear_btn.setMinimumHeight(40)
-        clear_btn.setStyleSheet(get_danger_button_style())
-        clear_btn.clicked.connect(lambda: self.data_edit.clear())
+        clear_btn.setStyleSheet(DANGER_BUTTON_STYLE)
+        clear_btn.clicked.connect(self._on_clear_data)
         
         btn_layout.addWidget(paste_btn)
         btn_layout.addWidget(load_btn)
@@ -208,6 +565,47 @@ class DataChatBotDemo(QWidget):
         
         return btn_container
     
+    def _create_data_limit_row(self) -> QWidget:
+        """
+        Create the row controlling how much data is sent to the AI.
+        
+        Returns:
+            QWidget: The configured limit row widget.
+        """
+        limit_container = QWidget()
+        limit_layout = QHBoxLayout(limit_container)
+        limit_layout.setContentsMargins(4, 0, 4, 0)
+        limit_layout.setSpacing(8)
+        
+        limit_label = QLabel("Max characters sent to AI:")
+        limit_label.setFont(_fonts()["small"])
+        limit_label.setStyleSheet(MUTED_LABEL_STYLE)
+        
+        self.max_chars_spin = QSpinBox()
+        self.max_chars_spin.setRange(1_000, 1_000_000)
+        self.max_chars_spin.setSingleStep(5_000)
+        self.max_chars_spin.setValue(MAX_DATA_CHARS)
+        self.max_chars_spin.setToolTip(
+            "Larger data is sampled (first, middle and last rows) before sending"
+        )
+        self.max_chars_spin.setStyleSheet(SPIN_BOX_STYLE)
+        self.max_chars_spin.valueChanged.connect(self._on_max_chars_changed)
+        
+        limit_layout.addWidget(limit_label)
+        limit_layout.addWidget(self.max_chars_spin)
+        limit_layout.addStretch()
+        
+        return limit_container
+    
+    def _on_max_chars_changed(self, value: int) -> None:
+        """
+        Update the data size limit used when prompting the AI.
+        
+        Args:
+            value (int): The new limit in characters.
+        """
+        self.llm_helper.max_data_chars = value
+    
     def _create_chat_panel(self) -> QWidget:
         """
         Create the chat interface panel.
@@ -216,24 +614,34 @@ class DataChatBotDemo(QWidget):
             QWidget: The configured chat panel widget.
         """
         chat_container = QWidget()
-        chat_container.setStyleSheet(get_container_style())
+        chat_container.setStyleSheet(CONTAINER_STYLE)
         chat_layout = QVBoxLayout(chat_container)
         chat_layout.setContentsMargins(24, 20, 24, 20)
         chat_layout.setSpacing(12)
 
         # Header
+        header_row = QHBoxLayout()
         chat_header = QLabel("💬 AI Assistant")
-        chat_header.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["header"], QFont.Weight.Bold))
-        chat_header.setStyleSheet("color: #2d3748; margin-bottom: 8px;")
-        chat_layout.addWidget(chat_header)
+        chat_header.setFont(_fonts()["header"])
+        chat_header.setStyleSheet(SECTION_HEADER_STYLE)
+        header_row.addWidget(chat_header, 1)
+        
+        save_btn = QPushButton("💾 Save Transcript")
+        save_btn.setMinimumHeight(36)
+        save_btn.setStyleSheet(PRIMARY_BUTTON_STYLE)
+        save_btn.clicked.connect(self._save_transcript)
+        header_row.addWidget(save_btn)
+        chat_layout.addLayout(header_row)
 
-        # Chat area
+        # Chat area; the document is bounded and keeps no undo history
         self.chat_area = QTextEdit()
         self.chat_area.setReadOnly(True)
-        self.chat_area.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["small"]))
+        self.chat_area.setUndoRedoEnabled(False)
+        self.chat_area.document().setMaximumBlockCount(CHAT_MAX_BLOCKS)
+        self.chat_area.setFont(_fonts()["small"])
         self.chat_area.setMinimumHeight(320)
-        self.chat_area.setStyleSheet(get_chat_area_style())
-        self.chat_area.setHtml(get_welcome_message())
+        self.chat_area.setStyleSheet(CHAT_AREA_STYLE)
+        self.chat_area.setHtml(WELCOME_MESSAGE)
         chat_layout.addWidget(self.chat_area, 1)
 
         # Input section
@@ -257,8 +665,8 @@ class DataChatBotDemo(QWidget):
         
         # Input label
         input_label = QLabel("Ask your question:")
-        input_label.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["small"], QFont.Weight.Medium))
-        input_label.setStyleSheet("color: #4a5568;")
+        input_label.setFont(_fonts()["label"])
+        input_label.setStyleSheet(MUTED_LABEL_STYLE)
         input_layout.addWidget(input_label)
         
         # Input row with text field and button
@@ -267,19 +675,27 @@ class DataChatBotDemo(QWidget):
         
         self.chat_input = QLineEdit()
         self.chat_input.setPlaceholderText("e.g., 'What patterns do you see?' or 'Convert to JSON'...")
-        self.chat_input.setFont(QFont("Segoe UI", STYLE_CONFIG["font_sizes"]["normal"]))
+        self.chat_input.setFont(_fonts()["normal"])
         self.chat_input.setMinimumHeight(44)
-        self.chat_input.setStyleSheet(get_chat_input_style())
+        self.chat_input.setStyleSheet(CHAT_INPUT_STYLE)
         
-        send_btn = QPushButton("Send ➤")
-        send_btn.setMinimumHeight(44)
-        send_btn.setMinimumWidth(100)
-        send_btn.setStyleSheet(get_send_button_style())
-        send_btn.clicked.connect(self._on_send)
+        self.send_btn = QPushButton("Send ➤")
+        self.send_btn.setMinimumHeight(44)
+        self.send_btn.setMinimumWidth(100)
+        self.send_btn.setStyleSheet(SEND_BUTTON_STYLE)
+        self.send_btn.clicked.connect(self._on_send)
         self.chat_input.returnPressed.connect(self._on_send)
         
+        self.batch_checkbox = QCheckBox("Submit as batch")
+        self.batch_checkbox.setToolTip(
+            "Send through the OpenAI Batch API: about half the cost, "
+            "results within 24 hours"
+        )
+        self.batch_checkbox.setStyleSheet(MUTED_LABEL_STYLE)
+        
         chat_input_row.addWidget(self.chat_input, 1)
-        chat_input_row.addWidget(send_btn)
+        chat_input_row.addWidget(self.batch_checkbox)
+        chat_input_row.addWidget(self.send_btn)
         input_layout.addLayout(chat_input_row)
         
         return input_container
@@ -292,16 +708,64 @@ class DataChatBotDemo(QWidget):
             QFrame: The configured status bar widget.
         """
         status_container = QFrame()
-        status_container.setStyleSheet(get_status_container_style())
+        status_container.setStyleSheet(STATUS_CONTAINER_STYLE)
         status_layout = QHBoxLayout(status_container)
         status_layout.setContentsMargins(8, 4, 8, 4)
         
         self.status = QLabel("Ready • Load your data and start asking questions")
-        self.status.setStyleSheet("color: #4a5568; font-size: 11pt; font-weight: 500;")
-        status_layout.addWidget(self.status)
+        self.status.setStyleSheet(STATUS_LABEL_STYLE)
+        status_layout.addWidget(self.status, 1)
+        
+        # Indeterminate progress bar animated while a request is in flight
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.setFixedSize(120, 6)
+        self.busy_bar.setStyleSheet(BUSY_BAR_STYLE)
+        self.busy_bar.hide()
+        status_layout.addWidget(self.busy_bar)
         
         return status_container
     
+    def _set_status(self, text: str) -> None:
+        """
+        Queue a message for the status label.
+        
+        The label is updated at most once per STATUS_FLUSH_MS, showing the
+        latest message, so bursts of updates cost a single repaint.
+        
+        Args:
+            text (str): The message to show.
+        """
+        self._status_queue.append(text)
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+    
+    @pyqtSlot()
+    def _flush_status(self) -> None:
+        """
+        Show the most recent queued status message if it differs from the label.
+        """
+        if not self._status_queue:
+            return
+        text = self._status_queue[-1]
+        self._status_queue.clear()
+        if text != self.status.text():
+            self.status.setText(text)
+    
+    @pyqtSlot()
+    def _on_clear_data(self) -> None:
+        """
+        Clear the data area and release everything held for the old data.
+        
+        Stops any file load in progress so no further chunks arrive, then
+        drops the cached data text and any mapped file.
+        """
+        self._stop_file_stream()
+        self.data_edit.clear()
+        self._invalidate_data_cache()
+        self._set_status("Data cleared")
+    
     def _paste_clipboard(self) -> None:
         """
         Paste content from the system clipboard into the data text area.
@@ -310,17 +774,21 @@ class DataChatBotDemo(QWidget):
         """
         text = QApplication.clipboard().text()
         if text:
+            self._stop_file_stream()
             self.data_edit.setPlainText(text)
-            self.status.setText("✅ Clipboard content pasted successfully")
+            self._set_status("✅ Clipboard content pasted successfully")
         else:
-            self.status.setText("⚠️ Clipboard is empty")
+            self._set_status("⚠️ Clipboard is empty")
     
     def _load_file(self) -> None:
         """
         Open a file dialog to load data from a file.
         
-        Supports CSV, TSV, TXT, and JSON files. Updates the status label
-        to indicate success or failure of the file loading operation.
+        Supports CSV, TSV, TXT, and JSON files. Files are decoded on a
+        background thread and appended to the data area in chunks; for very large files
+        the user can choose to load only the first rows; that needs
+        line-oriented bytes, so UTF-16 files are always loaded in full. Updates the status
+        label to indicate success or failure of the file loading operation.
         """
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
@@ -330,80 +798,610 @@ class DataChatBotDemo(QWidget):
         )
         if file_path:
             try:
-                with open(file_path, encoding="utf-8", errors="replace") as f:
-                    content = f.read()
-                    self.data_edit.setPlainText(content)
-                filename = os.path.basename(file_path)
-                self.status.setText(f"✅ Successfully loaded: {filename}")
+                path = Path(file_path)
+                filename = path.name
+                size = path.stat().st_size
+                with open(file_path, "rb") as handle:
+                    sampleable = _file_encoding(handle.read(4)) != "utf-16"
+                if (
+                    size > LARGE_FILE_BYTES and sampleable
+                    and self._confirm_sample_load(filename, size)
+                ):
+                    self._load_file_preview(file_path)
+                    self._set_status(
+                        f"✅ Showing first {SAMPLE_LOAD_ROWS:,} rows of: {filename} "
+                        "• questions use rows sampled from the whole file"
+                    )
+                    return
+                self._start_file_stream(file_path, filename)
             except Exception as ex:
-                self.status.setText(f"❌ Error loading file: {str(ex)}")
+                self._stop_file_stream()
+                self._set_status(f"❌ Error loading file: {str(ex)}")
+    
+    def _confirm_sample_load(self, filename: str, size: int) -> bool:
+        """
+        Ask whether to load only the first rows of a very large file.
+        
+        Args:
+            filename (str): The name of the file.
+            size (int): The size of the file in bytes.
+            
+        Returns:
+            bool: True to load only the first rows, False to load everything.
+        """
+        answer = QMessageBox.question(
+            self,
+            "Large file",
+            f"{filename} is {size / (1024 * 1024):.0f} MB.\n\n"
+            f"Load only the first {SAMPLE_LOAD_ROWS:,} rows?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes,
+        )
+        return answer == QMessageBox.StandardButton.Yes
+    
+    def _load_file_preview(self, file_path: str) -> None:
+        """
+        Show the first rows of a large file and keep the file mapped for questions.
+        
+        Only SAMPLE_LOAD_ROWS rows are decoded into the data area. The mapped
+        file stays open as the data source, so questions are asked about rows
+        sampled from the whole file without copying it into memory. Editing
+        the data area switches back to the edited text.
+        
+        Args:
+            file_path (str): The path of the file to load.
+        """
+        self._stop_file_stream()
+        self._close_data_mmap()
+        
+        with open(file_path, "rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        end = 0
+        for _ in range(SAMPLE_LOAD_ROWS):
+            end = mapped.find(b"\n", end) + 1
+            if end == 0:
+                end = len(mapped)
+                break
+        self.data_edit.setPlainText(mapped[:end].decode("utf-8-sig", errors="replace"))
+        
+        # Set after the text so the textChanged above does not close it
+        self._data_mmap = mapped
+        self._data_path = file_path
+        self._data_cache = None
+    
+    def _close_data_mmap(self) -> None:
+        """
+        Close the mapped file behind a large-file preview, if any.
+        """
+        if self._data_mmap is not None:
+            self._data_mmap.close()
+        self._data_mmap = None
+        self._data_path = None
+    
+    def _start_file_stream(self, file_path: str, filename: str) -> None:
+        """
+        Start loading a file into the data area on a background thread.
+        
+        Repaints of the data area are suspended and the area is read-only
+        until the load ends.
+        
+        Args:
+            file_path (str): The path of the file to load.
+            filename (str): The display name of the file.
+        """
+        self._stop_file_stream()
+        self._close_data_mmap()
+        
+        worker = FileLoadWorker(file_path)
+        worker.chunkReady.connect(self._on_file_chunk)
+        worker.finished.connect(self._on_file_loaded)
+        worker.failed.connect(self._on_file_load_failed)
+        worker.stopped.connect(worker.deleteLater)
+        self._load_worker = worker
+        self._load_filename = filename
+        
+        self.data_edit.clear()
+        self.data_edit.setReadOnly(True)
+        self.data_edit.setUpdatesEnabled(False)
+        self._set_status(f"📂 Loading {filename}...")
+        QThreadPool.globalInstance().start(WorkerRunnable(worker))
+    
+    @pyqtSlot(str)
+    def _on_file_chunk(self, text: str) -> None:
+        """
+        Append a decoded chunk of the file being loaded to the data area.
+        
+        Args:
+            text (str): The decoded text.
+        """
+        if self.sender() is not self._load_worker:
+            return
+        cursor = QTextCursor(self.data_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self._load_worker.chunk_consumed()
+    
+    @pyqtSlot()
+    def _on_file_loaded(self) -> None:
+        """
+        Finish a file load that read the whole file.
+        """
+        if self.sender() is not self._load_worker:
+            return
+        self._stop_file_stream()
+        self._set_status(f"✅ Successfully loaded: {self._load_filename}")
+        self._send_pending()
+    
+    @pyqtSlot(str)
+    def _on_file_load_failed(self, error: str) -> None:
+        """
+        Report a file load that failed part way through.
+        
+        Args:
+            error (str): The error message.
+        """
+        if self.sender() is not self._load_worker:
+            return
+        self._stop_file_stream()
+        self._set_status(f"❌ Error loading file: {error}")
+    
+    def _stop_file_stream(self) -> None:
+        """
+        Stop any file load in progress and make the data area editable again.
+        
+        A cancelled worker emits nothing more except stopped, which deletes it.
+        """
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+        self._load_worker = None
+        self.data_edit.setReadOnly(False)
+        self.data_edit.setUpdatesEnabled(True)
     
     def _on_send(self) -> None:
         """
         Handle the send button click or Enter key press.
         
-        Validates input, sends the question to the AI, and updates the chat area
-        with both the user question and AI response.
+        Validates input, adds the question to the chat area and starts streaming
+        the AI response on a background thread. Questions sent while another
+        request is in flight are queued and later sent together in one request.
+        Nothing is sent while a file is still loading.
         """
         user_question = self.chat_input.text().strip()
-        self.data_text = self.data_edit.toPlainText().strip()
         
-        if not self.data_text:
-            self.status.setText("⚠️ Please paste or load your data first")
+        if self._load_worker is not None:
+            self._set_status(f"⏳ Please wait for {self._load_filename} to finish loading")
+            return
+        if not self._current_data_text():
+            self._set_status("⚠️ Please paste or load your data first")
             return
         if not user_question:
-            self.status.setText("⚠️ Please type your question")
+            self._set_status("⚠️ Please type your question")
             return
-            
-        # Add user message to chat history
-        self._add_to_chat("You", user_question)
+        
+        if self.batch_checkbox.isChecked():
+            if self._llm_worker is not None:
+                self._set_status("⏳ Please wait for the current request to finish")
+                return
+            # Batch jobs are asked without the conversation, so they stay out of it
+            self._add_to_chat("You", user_question, notice=True)
+            self.chat_input.clear()
+            self._submit_batch(user_question)
+            return
+        
         self.chat_input.clear()
+        if self._llm_worker is not None:
+            self._pending.append(user_question)
+            self._set_status(
+                f"📝 {len(self._pending)} question(s) queued • sent together when the current request finishes"
+            )
+            return
+        # Questions left queued by a failed file load go out with this one
+        questions = [*self._pending, user_question]
+        self._pending.clear()
+        self._ask(questions)
+    
+    def _ask(self, questions: List[str]) -> None:
+        """
+        Add questions to the chat and stream the AI's answer on a background thread.
+        
+        Several questions are combined into a single request, and the reply
+        is split back into one answer per question when it arrives.
+        
+        Args:
+            questions (List[str]): The questions to ask, in the order they were sent.
+        """
+        data = self._current_data_text()
+        source = self._data_path
+        history = self._conversation_turns()
+        for question in questions:
+            self._add_to_chat("You", question)
+        self._in_flight = len(questions)
         
         # Show loading state
-        self.status.setText("🤔 AI is analyzing your data...")
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        QApplication.processEvents()
+        self._set_status("🤔 AI is analyzing your data...")
+        self._begin_ai_stream()
         
-        try:
-            ai_response = self.llm_helper.ask_llm(self.data_text, user_question)
-            self._add_to_chat("AI", ai_response)
-            self.status.setText("✅ Response received")
-        except Exception as ex:
-            error_msg = f"I apologize, but I encountered an error: {str(ex)}"
-            self._add_to_chat("AI", error_msg)
-            self.status.setText(f"❌ Error: {str(ex)}")
-        finally:
-            QApplication.restoreOverrideCursor()
+        prompt = questions[0] if len(questions) == 1 else combine_questions(questions)
+        worker = LLMStreamWorker(self.llm_helper, data, prompt, history, source)
+        worker.chunkReceived.connect(self._on_ai_chunk)
+        worker.finished.connect(self._on_ai_response)
+        worker.failed.connect(self._on_ai_error)
+        self._start_worker(worker)
+    
+    def _start_worker(self, worker: QObject) -> None:
+        """
+        Run a worker on the global thread pool.
+        
+        Only one worker runs at a time; the busy indicator is shown until it
+        finishes or fails, and queued questions are sent after that.
+        
+        Args:
+            worker (QObject): A worker with a run slot and finished/failed signals.
+        """
+        self.busy_bar.show()
+        worker.finished.connect(self._on_worker_done)
+        worker.failed.connect(self._on_worker_done)
+        self._llm_worker = worker
+        QThreadPool.globalInstance().start(WorkerRunnable(worker))
     
-    def _add_to_chat(self, sender: str, message: str) -> None:
+    def _submit_batch(self, question: str) -> None:
         """
-        Add a message to the chat history and update the display.
+        Submit a question through the Batch API on a background thread.
+        
+        Args:
+            question (str): The question to ask about the current data.
+        """
+        self._set_status("📦 Submitting batch job...")
+        self._batch_question = question
+        
+        data = self._current_data_text()
+        source = self._data_path
+        worker = TaskWorker(lambda: self.llm_helper.submit_batch([(data, question)], source))
+        worker.finished.connect(self._on_batch_submitted)
+        worker.failed.connect(self._on_ai_error)
+        self._start_worker(worker)
+    
+    @pyqtSlot(object)
+    def _on_batch_submitted(self, batch_id: str) -> None:
+        """
+        Track a newly submitted batch and start polling for its results.
+        
+        Args:
+            batch_id (str): The ID of the submitted batch.
+        """
+        self._pending_batches[batch_id] = self._batch_question
+        self._batch_timer.start()
+        self._set_status(f"📦 Batch submitted ({batch_id}) • results will appear when ready")
+    
+    @pyqtSlot()
+    def _poll_batches(self) -> None:
+        """
+        Check pending batches on a background thread.
+        
+        Polling is skipped while another request is in flight and retried
+        on the next timer tick.
+        """
+        if not self._pending_batches:
+            self._batch_timer.stop()
+            return
+        if self._llm_worker is not None:
+            return
+        
+        batch_ids = list(self._pending_batches)
+        worker = TaskWorker(
+            lambda: {batch_id: self.llm_helper.poll_batch(batch_id) for batch_id in batch_ids}
+        )
+        worker.finished.connect(self._on_batches_polled)
+        worker.failed.connect(self._on_batch_poll_failed)
+        self._start_worker(worker)
+    
+    @pyqtSlot(object)
+    def _on_batches_polled(self, statuses: Dict[str, Tuple[str, Optional[List[str]]]]) -> None:
+        """
+        Show the results of any batches that have finished.
+        
+        Args:
+            statuses (Dict[str, Tuple[str, Optional[List[str]]]]): Batch ID to
+                (status, responses) as returned by LLMHelper.poll_batch.
+        """
+        for batch_id, (status, responses) in statuses.items():
+            if status == "completed":
+                question = self._pending_batches.pop(batch_id)
+                answer = responses[0] if responses else "Batch job failed: no response"
+                self._add_to_chat("AI", f"**Batch result for:** {question}\n\n{answer}", notice=True)
+            elif status in ("failed", "expired", "cancelled"):
+                question = self._pending_batches.pop(batch_id)
+                self._add_to_chat(
+                    "AI", f"Batch job for \"{question}\" did not complete: {status}", notice=True
+                )
+        
+        if self._pending_batches:
+            self._set_status(f"📦 {len(self._pending_batches)} batch job(s) pending")
+        else:
+            self._batch_timer.stop()
+            self._set_status("✅ Batch results received")
+    
+    @pyqtSlot(str)
+    def _on_batch_poll_failed(self, error: str) -> None:
+        """
+        Report a failed batch status check; polling continues on the next tick.
+        
+        Args:
+            error (str): The error message.
+        """
+        self._set_status(f"⚠️ Could not check batch status: {error}")
+    
+    def _begin_ai_stream(self) -> None:
+        """
+        Open an AI message at the end of the chat area for streamed text.
+        
+        Deferred messages are rendered first so the stream lands after them.
+        """
+        if self._chat_dirty:
+            self._flush_chat()
+        cursor = self.chat_area.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        # A cursor rather than a position, so it follows evictions of old blocks
+        self._stream_start = QTextCursor(cursor)
+        self._stream_start.setKeepPositionOnInsert(True)
+        self._stream_tokens = 0
+        self._stream_began_at = time.monotonic()
+        
+        sender_format = QTextCharFormat()
+        sender_format.setFontWeight(QFont.Weight.Bold)
+        cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+        cursor.insertText("🤖 AI Assistant:", sender_format)
+        cursor.insertBlock(cursor.blockFormat(), QTextCharFormat())
+        self.chat_area.setTextCursor(cursor)
+    
+    def _end_ai_stream(self) -> None:
+        """
+        Remove the streamed text so the final message can replace it.
+        """
+        if self._stream_start is None:
+            return
+        cursor = QTextCursor(self.chat_area.document())
+        cursor.setPosition(self._stream_start.position())
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self._stream_start = None
+    
+    @pyqtSlot(str)
+    def _on_ai_chunk(self, chunk: str) -> None:
+        """
+        Append a streamed response fragment to the chat area.
+        
+        The API streams about one token per fragment, so the status bar counts
+        fragments as tokens and shows the generation rate, along with how many
+        questions are queued behind this one.
+        
+        Args:
+            chunk (str): The response fragment.
+        """
+        cursor = self.chat_area.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(chunk, QTextCharFormat())
+        
+        self._stream_tokens += 1
+        elapsed = time.monotonic() - self._stream_began_at
+        rate = f" • {self._stream_tokens / elapsed:.0f} tokens/s" if elapsed > 0 else ""
+        queued = f" • {len(self._pending)} question(s) queued" if self._pending else ""
+        self._set_status(f"✍️ Receiving response • {self._stream_tokens} tokens{rate}{queued}")
+        
+        scrollbar = self.chat_area.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
+    @pyqtSlot(str)
+    def _on_ai_response(self, ai_response: str) -> None:
+        """
+        Replace the streamed text with the fully formatted AI response.
+        
+        A reply to several combined questions is shown as one message per
+        answer, or as a single message if it cannot be split.
+        
+        Args:
+            ai_response (str): The complete AI response.
+        """
+        self._end_ai_stream()
+        answers = split_answers(ai_response, self._in_flight) if self._in_flight > 1 else None
+        for answer in answers or [ai_response]:
+            self._add_to_chat("AI", answer)
+        self._set_status("✅ Response received")
+    
+    @pyqtSlot(str)
+    def _on_ai_error(self, error: str) -> None:
+        """
+        Report a failed AI request in the chat area and status bar.
+        
+        The error and the questions it left unanswered are kept out of the
+        context sent with later questions.
+        
+        Args:
+            error (str): The error message.
+        """
+        error_msg = f"I apologize, but I encountered an error: {error}"
+        self._end_ai_stream()
+        self._notices.update(range(len(self.chat_history) - self._in_flight, len(self.chat_history)))
+        self._add_to_chat("AI", error_msg, notice=True)
+        self._set_status(f"❌ Error: {error}")
+    
+    @pyqtSlot()
+    def _on_worker_done(self) -> None:
+        """
+        Release the finished worker and send any queued questions.
+        """
+        if self._llm_worker is not None:
+            self._llm_worker.deleteLater()
+        self._llm_worker = None
+        self._in_flight = 0
+        self.busy_bar.hide()
+        self._send_pending()
+    
+    def _send_pending(self) -> None:
+        """
+        Send the queued questions once no request or file load is running.
+        
+        Questions queued before a file load started wait for it to finish,
+        so they are asked about the whole file. If a load fails they stay
+        queued and go out with the next question sent.
+        """
+        if not self._pending or self._llm_worker is not None or self._load_worker is not None:
+            return
+        questions = list(self._pending)
+        self._pending.clear()
+        if self._current_data_text():
+            self._ask(questions)
+        else:
+            self._set_status("⚠️ Queued questions were dropped because the data was cleared")
+    
+    def _add_to_chat(self, sender: str, message: str, notice: bool = False) -> None:
+        """
+        Add a message to the chat history and append it to the display.
+        
+        Only the new message is rendered; earlier messages are left in place
+        rather than re-rendering the whole history. While the window is
+        hidden or minimized rendering is deferred until it is shown again.
         
         Args:
             sender (str): The sender of the message ("You" or "AI").
             message (str): The message content to add.
+            notice (bool): Whether the message is shown only to the user, such as
+                an error, and left out of the context sent to the AI.
         """
         message = message.strip()
         if not message: 
             return
-            
+        if notice:
+            self._notices.add(len(self.chat_history))
         self.chat_history.append((sender, message))
         
-        # Build formatted HTML using the helper
-        formatted_html = self.llm_helper.build_chat_history_html(self.chat_history)
-        self.chat_area.setHtml(formatted_html)
+        if self.isMinimized() or not self.chat_area.isVisible():
+            self._chat_dirty = True
+            return
+        self._flush_chat()
+    
+    def _flush_chat(self) -> None:
+        """
+        Render every message that has not been rendered yet.
+        """
+        self._chat_dirty = False
+        pending = self.chat_history[self._rendered_count:]
+        for sender, message in pending:
+            self._render_message(sender, message)
+        if pending:
+            self.chat_area.ensureCursorVisible()
+    
+    def showEvent(self, event) -> None:
+        """
+        Render messages that arrived while the window was hidden or minimized.
         
-        # Scroll to bottom
-        scrollbar = self.chat_area.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        Args:
+            event: The show event.
+        """
+        super().showEvent(event)
+        if self._chat_dirty:
+            self._flush_chat()
+    
+    def _render_message(self, sender: str, message: str) -> None:
+        """
+        Append one message to the end of the chat area.
+        
+        Args:
+            sender (str): The sender of the message ("You" or "AI").
+            message (str): The message content.
+        """
+        # The first message replaces the welcome text
+        if self._rendered_count == 0:
+            self.chat_area.clear()
+        self._rendered_count += 1
+        
+        cursor = self.chat_area.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self._rendered_count > 1:
+            cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+        
+        if sender == "You":
+            # Plain text needs no HTML parsing
+            cursor.setBlockFormat(self._user_sender_block)
+            cursor.insertText(f"👤 {sender}:", self._user_sender_format)
+            cursor.insertBlock(self._user_body_block, self._user_body_format)
+            # A line separator keeps multi-line messages in one block
+            cursor.insertText(message.replace("\n", "\u2028"), self._user_body_format)
+        else:
+            # Append formatted HTML for the new message using the helper
+            cursor.insertHtml(self.llm_helper.format_chat_message(sender, message))
+        self.chat_area.setTextCursor(cursor)
+    
+    def closeEvent(self, event) -> None:
+        """
+        Stop any in-flight AI request or file load before the window closes.
+        
+        Retry waits are cut short and streams are closed after their next
+        fragment, but a request blocked on the network cannot be interrupted.
+        The window closes after at most CLOSE_WAIT_MS; such a request is left
+        to end on its own, within API_TIMEOUT_SECONDS, and the process exits
+        once it has.
+        
+        Args:
+            event: The close event.
+        """
+        self.llm_helper.close()
+        if self._llm_worker is not None:
+            self._llm_worker.cancel()
+        self._stop_file_stream()
+        QThreadPool.globalInstance().waitForDone(CLOSE_WAIT_MS)
+        self._close_data_mmap()
+        super().closeEvent(event)
+    
+    def _save_transcript(self) -> None:
+        """
+        Save the full chat history to a Markdown file chosen by the user.
+        
+        The chat area drops its oldest messages in long conversations, but
+        chat_history keeps every turn, so the transcript is always complete.
+        """
+        if not self.chat_history:
+            self._set_status("⚠️ There is no conversation to save yet")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save transcript", "transcript.md", "Markdown Files (*.md);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        transcript = "\n\n".join(
+            f"**{sender}:**\n\n{message}" for sender, message in self.chat_history
+        )
+        path = Path(file_path)
+        try:
+            path.write_text(transcript + "\n", encoding="utf-8")
+        except OSError as ex:
+            self._set_status(f"❌ Error saving transcript: {str(ex)}")
+            return
+        self._set_status(f"✅ Transcript saved: {path.name}")
     
     def clear_chat_history(self) -> None:
         """
         Clear the chat history and reset the chat area to welcome message.
         """
         self.chat_history.clear()
-        self.chat_area.setHtml(get_welcome_message())
-        self.status.setText("Chat history cleared")
+        self._notices.clear()
+        self._rendered_count = 0
+        self._chat_dirty = False
+        self.chat_area.setHtml(WELCOME_MESSAGE)
+        self._set_status("Chat history cleared")
+    
+    def _conversation_turns(self) -> List[Tuple[str, str]]:
+        """
+        Get the chat turns sent to the AI as context for a new question.
+        
+        Returns:
+            List[Tuple[str, str]]: The chat history without errors, batch
+                jobs and other notices.
+        """
+        return [
+            turn for index, turn in enumerate(self.chat_history) if index not in self._notices
+        ]
     
     def get_chat_history(self) -> List[Tuple[str, str]]:
         """
@@ -422,7 +1420,7 @@ class DataChatBotDemo(QWidget):
             data (str): The data text to set.
         """
         self.data_edit.setPlainText(data)
-        self.data_text = data
+        self._data_cache = data.strip()
     
     def get_data_text(self) -> str:
         """
@@ -431,7 +1429,36 @@ class DataChatBotDemo(QWidget):
         Returns:
             str: The current data text.
         """
-        return self.data_edit.toPlainText().strip()
+        return self._current_data_text()
+    
+    @pyqtSlot()
+    def _invalidate_data_cache(self) -> None:
+        """
+        Drop the cached data text after the data editor changes.
+        
+        An edited or cleared data area no longer matches a mapped file, so
+        the mapping is closed as well.
+        """
+        self._data_cache = None
+        self._close_data_mmap()
+    
+    def _current_data_text(self) -> str:
+        """
+        Get the stripped data text, copying it out of the editor only if it changed.
+        
+        Copying the document out of the editor is proportional to its size,
+        so repeated questions about an unchanged paste skip it. While a large
+        file preview is shown, rows are sampled from the mapped file instead.
+        
+        Returns:
+            str: The current data text.
+        """
+        if self._data_cache is None:
+            if self._data_mmap is not None:
+                self._data_cache = sample_mapped_data(self._data_mmap)
+            else:
+                self._data_cache = self.data_edit.toPlainText().strip()
+        return self._data_cache
 
 
 def main() -> None:
@@ -441,15 +1468,15 @@ def main() -> None:
     Creates the QApplication, initializes the main widget,
     and starts the event loop.
     """
-    app = QApplication(sys.argv)
-    app.setStyle('Fusion')  # Use Fusion style for better cross-platform appearance
-    
-    # Check if API key is available
+    # Check if API key is available before starting Qt
     if not LLMHelper.validate_api_key():
         print("Error: OPENAI_API_KEY environment variable is not set.")
         print("Please set your OpenAI API key before running the application.")
         sys.exit(1)
     
+    app = QApplication(sys.argv)
+    app.setStyle('Fusion')  # Use Fusion style for better cross-platform appearance
+    
     try:
         widget = DataChatBotDemo()
         widget.show()
@@ -2,20 +2,16 @@
 CSS styling module for the AI-Powered Data Chatbot application.
 
 This module contains all styling constants and methods for the PyQt6 application,
-providing a centralized location for UI styling definitions.
+providing a centralized location for UI styling definitions. The stylesheets are
+built once at import time; the get_* functions return the shared constants.
 """
 
-from typing import Dict, Any
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
 
 
-def get_main_stylesheet() -> str:
-    """
-    Get the main application stylesheet.
-    
-    Returns:
-        str: The main stylesheet string for the application.
-    """
-    return """
+MAIN_STYLESHEET = """
     QWidget {
         background: #f1f5f9;
         font-family: 'Segoe UI', 'SF Pro Display', Arial, sans-serif;
@@ -54,14 +50,17 @@ def get_main_stylesheet() -> str:
     """
 
 
-def get_header_frame_style() -> str:
+def get_main_stylesheet() -> str:
     """
-    Get the header frame stylesheet.
+    Get the main application stylesheet.
     
     Returns:
-        str: The header frame stylesheet string.
+        str: The main stylesheet string for the application.
     """
-    return """
+    return MAIN_STYLESHEET
+
+
+HEADER_FRAME_STYLE = """
     QFrame {
         background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
             stop:0 #e6f3ff, stop:1 #f0f8ff);
@@ -72,14 +71,17 @@ def get_header_frame_style() -> str:
     """
 
 
-def get_splitter_style() -> str:
+def get_header_frame_style() -> str:
     """
-    Get the splitter stylesheet.
+    Get the header frame stylesheet.
     
     Returns:
-        str: The splitter stylesheet string.
+        str: The header frame stylesheet string.
     """
-    return """
+    return HEADER_FRAME_STYLE
+
+
+SPLITTER_STYLE = """
     QSplitter::handle {
         background: #e1e5e9;
         border-radius: 3px;
@@ -90,14 +92,17 @@ def get_splitter_style() -> str:
     """
 
 
-def get_container_style() -> str:
+def get_splitter_style() -> str:
     """
-    Get the container widget stylesheet.
+    Get the splitter stylesheet.
     
     Returns:
-        str: The container stylesheet string.
+        str: The splitter stylesheet string.
     """
-    return """
+    return SPLITTER_STYLE
+
+
+CONTAINER_STYLE = """
     QWidget {
         background: white;
         border-radius: 16px;
@@ -106,14 +111,17 @@ def get_container_style() -> str:
     """
 
 
-def get_data_edit_style() -> str:
+def get_container_style() -> str:
     """
-    Get the data edit text area stylesheet.
+    Get the container widget stylesheet.
     
     Returns:
-        str: The data edit stylesheet string.
+        str: The container stylesheet string.
     """
-    return """
+    return CONTAINER_STYLE
+
+
+DATA_EDIT_STYLE = """
     QPlainTextEdit {
         background: #f7fafc;
         border: 2px solid #e2e8f0;
@@ -129,14 +137,17 @@ def get_data_edit_style() -> str:
     """
 
 
-def get_primary_button_style() -> str:
+def get_data_edit_style() -> str:
     """
-    Get the primary button stylesheet.
+    Get the data edit text area stylesheet.
     
     Returns:
-        str: The primary button stylesheet string.
+        str: The data edit stylesheet string.
     """
-    return """
+    return DATA_EDIT_STYLE
+
+
+PRIMARY_BUTTON_STYLE = """
     QPushButton {
         background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
             stop:0 #4299e1, stop:1 #3182ce);
@@ -155,14 +166,17 @@ def get_primary_button_style() -> str:
     """
 
 
-def get_danger_button_style() -> str:
+def get_primary_button_style() -> str:
     """
-    Get the danger button stylesheet.
+    Get the primary button stylesheet.
     
     Returns:
-        str: The danger button stylesheet string.
+        str: The primary button stylesheet string.
     """
-    return """
+    return PRIMARY_BUTTON_STYLE
+
+
+DANGER_BUTTON_STYLE = """
     QPushButton {
         background: #fed7d7;
         color: #c53030;
@@ -179,14 +193,17 @@ def get_danger_button_style() -> str:
     """
 
 
-def get_chat_area_style() -> str:
+def get_danger_button_style() -> str:
     """
-    Get the chat area stylesheet.
+    Get the danger button stylesheet.
     
     Returns:
-        str: The chat area stylesheet string.
+        str: The danger button stylesheet string.
     """
-    return """
+    return DANGER_BUTTON_STYLE
+
+
+CHAT_AREA_STYLE = """
     QTextEdit {
         background: #f8fafc;
         border: 2px solid #e2e8f0;
@@ -211,14 +228,41 @@ def get_chat_area_style() -> str:
     """
 
 
-def get_chat_input_style() -> str:
+def get_chat_area_style() -> str:
     """
-    Get the chat input stylesheet.
+    Get the chat area stylesheet.
     
     Returns:
-        str: The chat input stylesheet string.
+        str: The chat area stylesheet string.
     """
-    return """
+    return CHAT_AREA_STYLE
+
+
+SPIN_BOX_STYLE = """
+    QSpinBox {
+        background: white;
+        border: 2px solid #e2e8f0;
+        border-radius: 8px;
+        padding: 4px 8px;
+        color: #2d3748;
+    }
+    QSpinBox:focus {
+        border-color: #4299e1;
+    }
+    """
+
+
+def get_spin_box_style() -> str:
+    """
+    Get the spin box stylesheet.
+    
+    Returns:
+        str: The spin box stylesheet string.
+    """
+    return SPIN_BOX_STYLE
+
+
+CHAT_INPUT_STYLE = """
     QLineEdit {
         background: white;
         border: 2px solid #e2e8f0;
@@ -234,14 +278,17 @@ def get_chat_input_style() -> str:
     """
 
 
-def get_send_button_style() -> str:
+def get_chat_input_style() -> str:
     """
-    Get the send button stylesheet.
+    Get the chat input stylesheet.
     
     Returns:
-        str: The send button stylesheet string.
+        str: The chat input stylesheet string.
     """
-    return """
+    return CHAT_INPUT_STYLE
+
+
+SEND_BUTTON_STYLE = """
     QPushButton {
         background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
             stop:0 #4299e1, stop:1 #3182ce);
@@ -264,14 +311,17 @@ def get_send_button_style() -> str:
     """
 
 
-def get_status_container_style() -> str:
+def get_send_button_style() -> str:
     """
-    Get the status container stylesheet.
+    Get the send button stylesheet.
     
     Returns:
-        str: The status container stylesheet string.
+        str: The send button stylesheet string.
     """
-    return """
+    return SEND_BUTTON_STYLE
+
+
+STATUS_CONTAINER_STYLE = """
     QFrame {
         background: #edf2f7;
         border-radius: 8px;
@@ -281,14 +331,40 @@ def get_status_container_style() -> str:
     """
 
 
-def get_welcome_message() -> str:
+def get_status_container_style() -> str:
     """
-    Get the welcome message HTML for the chat area.
+    Get the status container stylesheet.
     
     Returns:
-        str: The welcome message HTML string.
+        str: The status container stylesheet string.
+    """
+    return STATUS_CONTAINER_STYLE
+
+
+BUSY_BAR_STYLE = """
+    QProgressBar {
+        background: #e2e8f0;
+        border: none;
+        border-radius: 3px;
+    }
+    QProgressBar::chunk {
+        background: #4299e1;
+        border-radius: 3px;
+    }
+    """
+
+
+def get_busy_bar_style() -> str:
+    """
+    Get the busy indicator stylesheet.
+    
+    Returns:
+        str: The busy indicator stylesheet string.
     """
-    return """
+    return BUSY_BAR_STYLE
+
+
+WELCOME_MESSAGE = """
     <div style="text-align: center; color: #718096; margin: 40px 20px;">
         <h3 style="color: #4a5568; margin-bottom: 12px;">👋 Welcome to your AI Data Assistant!</h3>
         <p style="margin: 8px 0; line-height: 1.6;">Load your data on the left, then ask questions like:</p>
@@ -302,36 +378,81 @@ def get_welcome_message() -> str:
     """
 
 
-# Style configuration dictionary
-STYLE_CONFIG: Dict[str, Any] = {
-    "font_sizes": {
-        "title": 24,
-        "subtitle": 13,
-        "header": 16,
-        "normal": 12,
-        "small": 11,
-        "code": 10,
-    },
-    "colors": {
-        "primary": "#4299e1",
-        "secondary": "#3182ce",
-        "success": "#38b2ac",
-        "danger": "#c53030",
-        "text_primary": "#2d3748",
-        "text_secondary": "#4a5568",
-        "background": "#f1f5f9",
-        "white": "white",
-    },
-    "spacing": {
-        "small": 8,
-        "medium": 12,
-        "large": 16,
-        "extra_large": 20,
-    },
-    "border_radius": {
-        "small": 8,
-        "medium": 12,
-        "large": 16,
-        "extra_large": 22,
-    },
-}
\ No newline at end of file
+def get_welcome_message() -> str:
+    """
+    Get the welcome message HTML for the chat area.
+    
+    Returns:
+        str: The welcome message HTML string.
+    """
+    return WELCOME_MESSAGE
+
+
+# Inline label styles shared by several widgets
+TITLE_LABEL_STYLE = "color: #1a365d; margin: 0; background: transparent;"
+SUBTITLE_LABEL_STYLE = "color: #2c5282; margin: 4px 0 0 0; background: transparent;"
+SECTION_HEADER_STYLE = "color: #2d3748; margin-bottom: 8px;"
+INSTRUCTION_LABEL_STYLE = "color: #4a5568; margin-bottom: 4px;"
+MUTED_LABEL_STYLE = "color: #4a5568;"
+STATUS_LABEL_STYLE = "color: #4a5568; font-size: 11pt; font-weight: 500;"
+
+
+@dataclass(frozen=True, slots=True)
+class FontSizes:
+    """Font point sizes for each text role."""
+    
+    title: int = 24
+    subtitle: int = 13
+    header: int = 16
+    normal: int = 12
+    small: int = 11
+    code: int = 10
+
+
+@dataclass(frozen=True, slots=True)
+class Colors:
+    """Named colors of the application theme."""
+    
+    primary: str = "#4299e1"
+    secondary: str = "#3182ce"
+    success: str = "#38b2ac"
+    danger: str = "#c53030"
+    text_primary: str = "#2d3748"
+    text_secondary: str = "#4a5568"
+    background: str = "#f1f5f9"
+    white: str = "white"
+
+
+@dataclass(frozen=True, slots=True)
+class Spacing:
+    """Layout spacing in pixels."""
+    
+    small: int = 8
+    medium: int = 12
+    large: int = 16
+    extra_large: int = 20
+
+
+@dataclass(frozen=True, slots=True)
+class BorderRadius:
+    """Corner radii in pixels."""
+    
+    small: int = 8
+    medium: int = 12
+    large: int = 16
+    extra_large: int = 22
+
+
+FONTS = FontSizes()
+COLORS = Colors()
+SPACING = Spacing()
+BORDER_RADIUS = BorderRadius()
+
+
+# Read-only dictionary view of the values above, kept for existing callers
+STYLE_CONFIG: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "font_sizes": MappingProxyType(asdict(FONTS)),
+    "colors": MappingProxyType(asdict(COLORS)),
+    "spacing": MappingProxyType(asdict(SPACING)),
+    "border_radius": MappingProxyType(asdict(BORDER_RADIUS)),
+})
\ No newline at end of file